@@ -1,19 +1,70 @@
 # coding: utf-8
+import time
+
 from apispec.ext.marshmallow import MarshmallowPlugin
+from apispec.ext.marshmallow.common import resolve_schema_instance
 
+from apispec_marshmallow_advanced.common import SchemaNameIndex
+from apispec_marshmallow_advanced.common import VariantCache
 from apispec_marshmallow_advanced.common import generate_schema_name
+from apispec_marshmallow_advanced.common import resolve_variant_key
 from apispec_marshmallow_advanced.openapi import HapicOpenAPIConverter
 
 
 class MarshmallowAdvancedPlugin(MarshmallowPlugin):
     def __init__(self, schema_name_resolver=None):
-        schema_name_resolver = schema_name_resolver or generate_schema_name
-        super().__init__(schema_name_resolver)
+        super().__init__(schema_name_resolver or generate_schema_name)
+        # Memoized and collision checked names of schemas of the spec
+        self.schema_names = None
+        # Conversion duration (in seconds) of each registered schema,
+        # keyed by component name
+        self.conversion_times = {}
+        # Effective fields of schema variants, prepared ones being kept
+        self.variant_cache = VariantCache()
 
     def init_spec(self, spec):
         super().init_spec(spec)
+        self.schema_names = SchemaNameIndex(self.schema_name_resolver)
         self.openapi = HapicOpenAPIConverter(
             openapi_version=spec.openapi_version,
             spec=self.spec,
-            schema_name_resolver=self.schema_name_resolver,
+            schema_name_resolver=self.schema_names,
+            variant_cache=self.variant_cache,
         )
+
+    def schema_helper(self, name, _, schema=None, **kwargs):
+        """See parent method"""
+        if schema is None:
+            return None
+
+        start = time.perf_counter()
+        self.openapi.add_component_name(schema, name)
+        json_schema = super().schema_helper(name, _, schema=schema, **kwargs)
+        # Nested schemas conversion time is included in this one
+        self.conversion_times[name] = time.perf_counter() - start
+        return json_schema
+
+    def prepare(self, schemas):
+        """Resolve schema classes (auto-generating only/exclude variants) and
+        names of given schemas and of all their nested schemas, so that later
+        schemas and paths registration only hit warm caches.
+
+        :param schemas: iterable of schema classes or instances
+        :return: dict of resolved schema names, keyed by resolved schema class
+            (or SchemaVariant)
+        """
+        resolved = {}
+        seen = set()
+        for schema in schemas:
+            # Whole nested tree is computed once, from schema classes
+            schema = resolve_schema_instance(schema)
+            for variant_key in self.variant_cache.prepare(schema):
+                if variant_key in seen:
+                    continue
+                seen.add(variant_key)
+
+                schema_cls = resolve_variant_key(
+                    self.spec, variant_key, self.variant_cache
+                )
+                resolved[schema_cls] = self.schema_names(schema_cls)
+        return resolved
@@ -1,4 +1,8 @@
 # coding: utf-8
+import collections
+import hashlib
+import types
+
 import marshmallow
 
 
@@ -7,23 +11,18 @@ def get_excluded_params(schema):
     Get all params excluded in this schema,
     if "only" is provided in schema instance,
     consider all not included params as excluded.
+    Nested params (dotted paths like "author.email") don't exclude any field
+    of this schema.
     :param schema: instance or cls schema
     :return: set of excluded params
     """
     if isinstance(schema, type):
         return set()
 
-    exclude = set()
-    only = set()
-    if getattr(schema, "exclude", ()):
-        exclude = set(getattr(schema, "exclude", ()))
-    if getattr(schema, "only", ()):
-        only = set(getattr(schema, "only", ()))
-    if only:
-        for field in schema._declared_fields:
-            if field not in only:
-                exclude.add(str(field))
-    return exclude
+    fields = get_variant_fields(schema).fields
+    return {
+        str(field) for field in type(schema)._declared_fields if field not in fields
+    }
 
 
 def generate_id(schema, exclude=()):
@@ -34,70 +33,404 @@ def generate_id(schema, exclude=()):
     :param exclude: excluded fields
     :return: str id related to schema and exclude params
     """
-    schema_id = ""
+    if not isinstance(schema, type):
+        schema = type(schema)
+    fields = sorted(
+        field for field in schema._declared_fields.keys() if field not in exclude
+    )
+    return "{}({})".format(
+        schema.__name__, "".join("_" + str(field) for field in fields)
+    )
+
+
+# Effective fields of a schema variant, and variant keys of nested schemas of
+# each field
+VariantFields = collections.namedtuple("VariantFields", ("fields", "nested"))
+
+
+def _split_options(names, with_parents=False):
+    """
+    Split only/exclude params into names of this schema fields and (dotted)
+    params of its nested fields.
+    :param names: only/exclude params
+    :param with_parents: consider "parent.child" as a "parent" param too
+    :return: (set of field names, {field name: set of nested params})
+    """
+    fields = set()
+    nested = {}
+    for name in names:
+        parent, dot, child = name.partition(".")
+        if dot:
+            nested.setdefault(parent, set()).add(child)
+            if not with_parents:
+                continue
+        fields.add(parent)
+    return fields, nested
+
+
+def _make_variant_key(schema_cls, only, exclude):
+    if only is not None:
+        # "a.b.c" implies "a" and "a.b": equal variants get equal keys
+        only = frozenset(
+            ".".join(parts[:index])
+            for parts in (name.split(".") for name in only)
+            for index in range(1, len(parts) + 1)
+        )
+    return schema_cls, only, frozenset(exclude) | frozenset(schema_cls.opts.exclude)
+
+
+def _get_nested_field(field):
+    """
+    Return the Nested field of a field (itself, List items or Dict values)
+    to which marshmallow propagates only/exclude params of the field, None
+    if any.
+    """
+    for attribute in ("inner", "value_field"):
+        inner = getattr(field, attribute, None)
+        if isinstance(inner, marshmallow.fields.Field):
+            field = inner
+            break
+    if isinstance(field, marshmallow.fields.Nested):
+        return field
+    return None
+
+
+def _iter_nested_fields(field):
+    """
+    Yield Nested fields of a field (itself, or items of List, Tuple and Dict
+    fields, recursively), with True if only/exclude params of the field are
+    propagated to it (see `_get_nested_field`).
+    """
+    nested_field = _get_nested_field(field)
+    if nested_field is not None:
+        yield nested_field, True
+        return
+
+    pending = [field]
+    while pending:
+        field = pending.pop()
+        if isinstance(field, marshmallow.fields.Nested):
+            yield field, False
+            continue
+        for attribute in ("inner", "value_field"):
+            inner = getattr(field, attribute, None)
+            if isinstance(inner, marshmallow.fields.Field):
+                pending.append(inner)
+        pending.extend(reversed(getattr(field, "tuple_fields", ())))
+
+
+def _get_nested_schema_class(schema_cls, nested_field):
+    """
+    Return the schema class of a Nested field, None if resolved only when
+    schema is instantiated (callable).
+    """
+    nested_schema = nested_field.nested
+    if nested_schema == "self":
+        return schema_cls
+    if isinstance(nested_schema, str):
+        return marshmallow.class_registry.get_class(nested_schema)
+    if isinstance(nested_schema, marshmallow.Schema):
+        return type(nested_schema)
+    if isinstance(nested_schema, type):
+        return nested_schema
+    return None
+
+
+def get_variant_key(schema):
+    """
+    Return variant key of a schema: (schema cls, only, exclude) where only and
+    exclude params propagated by marshmallow to nested fields of a schema
+    instance are given back as dotted paths.
+    :param schema: instance or cls schema
+    :return: (schema cls, frozenset or None, frozenset) tuple
+    """
     if isinstance(schema, type):
-        schema_id += schema.__name__
+        return _make_variant_key(schema, None, ())
+
+    schema_cls = type(schema)
+    only = None if schema.only is None else set(schema.only)
+    exclude = set(schema.exclude)
+    declared_fields = schema_cls._declared_fields
+    for name, field in schema.declared_fields.items():
+        declared_field = declared_fields.get(name)
+        if declared_field is None or _get_nested_field(field) is None:
+            continue
+        if only is not None and field.only is not None:
+            if set(field.only) != set(declared_field.only or ()):
+                only.update("{}.{}".format(name, child) for child in field.only)
+        if field.exclude:
+            exclude.update(
+                "{}.{}".format(name, child)
+                for child in set(field.exclude) - set(declared_field.exclude)
+            )
+    return _make_variant_key(schema_cls, only, exclude)
+
+
+def _get_variant_fields(schema_cls, only, exclude):
+    if only is not None:
+        only_fields, nested_only = _split_options(only, with_parents=True)
     else:
-        schema_id += type(schema).__name__
+        only_fields, nested_only = None, {}
+    exclude_fields, nested_exclude = _split_options(exclude)
+
+    fields = []
+    nested = {}
+    for name, field in schema_cls._declared_fields.items():
+        if name in exclude_fields or (
+            only_fields is not None and name not in only_fields
+        ):
+            continue
+        fields.append(name)
+
+        # Variants of nested schemas, as marshmallow would instantiate them
+        nested_keys = []
+        for nested_field, propagated in _iter_nested_fields(field):
+            nested_cls = _get_nested_schema_class(schema_cls, nested_field)
+            if nested_cls is None:
+                continue
+
+            child_only = nested_field.only
+            child_exclude = set(nested_field.exclude)
+            if propagated:
+                if name in nested_only:
+                    child_only = set(nested_only[name])
+                    if nested_field.only:
+                        child_only &= set(nested_field.only)
+                child_exclude |= nested_exclude.get(name, set())
+            nested_schema = nested_field.nested
+            if isinstance(nested_schema, marshmallow.Schema):
+                if child_only is None:
+                    child_only = nested_schema.only
+                elif nested_schema.only is not None:
+                    child_only = set(child_only) & set(nested_schema.only)
+                child_exclude |= set(nested_schema.exclude)
+            nested_keys.append(
+                _make_variant_key(nested_cls, child_only, child_exclude)
+            )
+        if nested_keys:
+            nested[name] = tuple(nested_keys)
+
+    return VariantFields(frozenset(fields), nested)
+
+
+def get_variant_fields(schema):
+    """
+    Return effective fields of a schema and variant keys of its nested
+    schemas (not memoized, see `VariantCache`).
+    :param schema: instance or cls schema
+    :return: VariantFields
+    """
+    return _get_variant_fields(*get_variant_key(schema))
+
+
+def get_variant_tree(schema):
+    """
+    Return effective fields of a schema and of all its (transitively) nested
+    schemas, computed from schema classes in one traversal, without
+    instantiating nested schemas (not memoized, see `VariantCache`).
+    :param schema: instance or cls schema
+    :return: read-only mapping of VariantFields, keyed by variant key
+    """
+    return _get_variant_tree(
+        get_variant_key(schema), lambda key: _get_variant_fields(*key)
+    )
+
 
-    # fields
-    fields = [field for field in schema._declared_fields.keys() if field not in exclude]
-    fields = sorted(fields)
-    schema_id += "("
-    for field in fields:
-        schema_id += "_" + str(field)
-    schema_id += ")"
+def _get_variant_tree(root_key, get_fields):
+    tree = {}
+    pending = [root_key]
+    while pending:
+        key = pending.pop()
+        if key in tree:
+            continue
+        tree[key] = get_fields(key)
+        for nested_keys in tree[key].nested.values():
+            pending.extend(nested_keys)
+    return types.MappingProxyType(tree)
 
-    return schema_id
+
+class VariantCache(object):
+    """
+    Effective fields of schema variants (see `get_variant_fields`), keyed by
+    variant key, memoized for one plugin. Fields of prepared schemas (see
+    `prepare`) are kept, others are bounded so they don't keep every schema
+    class (eg. dynamically created ones) alive.
+    """
+
+    # Max count of cached fields of not prepared variants (least recently
+    # used ones are dropped first)
+    cache_size = 1024
+
+    def __init__(self):
+        self._prepared = {}
+        self._fields = collections.OrderedDict()
+
+    def get_fields(self, variant_key):
+        """
+        Return effective fields of a variant.
+        :param variant_key: (schema cls, only, exclude) tuple
+        :return: VariantFields
+        """
+        try:
+            return self._prepared[variant_key]
+        except KeyError:
+            pass
+
+        try:
+            fields = self._fields[variant_key]
+        except KeyError:
+            fields = self._fields[variant_key] = _get_variant_fields(*variant_key)
+            if len(self._fields) > self.cache_size:
+                self._fields.popitem(last=False)
+        else:
+            self._fields.move_to_end(variant_key)
+        return fields
+
+    def prepare(self, schema):
+        """
+        Compute (once) and keep effective fields of a schema and of all its
+        nested schemas (see `get_variant_tree`).
+        :param schema: instance or cls schema
+        :return: read-only mapping of VariantFields, keyed by variant key
+        """
+        tree = _get_variant_tree(
+            get_variant_key(schema),
+            lambda key: self._prepared.get(key) or _get_variant_fields(*key),
+        )
+        self._prepared.update(tree)
+        return tree
 
 
-def schema_class_resolver(marshmallow_plugin, schema):
+class SchemaVariant(object):
+    """
+    Only/exclude variant of a schema class. Resolved (and named) instead of
+    a dynamically created schema subclass, which would run marshmallow
+    metaclass and grow its class registry.
+    Custom name resolvers are given `get_schema_class()` instead.
+    :param schema_cls: schema class
+    :param exclude: excluded fields
+    """
+
+    __slots__ = ("schema_cls", "exclude", "_schema_class")
+
+    def __init__(self, schema_cls, exclude):
+        self.schema_cls = schema_cls
+        self.exclude = frozenset(exclude)
+        self._schema_class = None
+
+    @property
+    def __name__(self):
+        return self.schema_cls.__name__
+
+    @property
+    def opts(self):
+        return _VariantOpts(self.exclude)
+
+    def get_schema_class(self):
+        """
+        Return a subclass of the schema class excluding variant fields (with
+        Meta.exclude), as schema class resolving created before variants.
+        Created once, and not registered in marshmallow class registry.
+        :return: schema class
+        """
+        if self._schema_class is None:
+            schema_cls = self.schema_cls
+            meta = type(
+                "Meta",
+                (getattr(schema_cls, "Meta", object),),
+                {"register": False, "exclude": tuple(sorted(self.exclude))},
+            )
+            self._schema_class = type(schema_cls)(
+                schema_cls.__name__,
+                (schema_cls,),
+                {
+                    "Meta": meta,
+                    "__module__": schema_cls.__module__,
+                    "__qualname__": schema_cls.__qualname__,
+                    "_schema_name": generate_schema_name(self),
+                },
+            )
+        return self._schema_class
+
+    def __eq__(self, other):
+        if not isinstance(other, SchemaVariant):
+            return NotImplemented
+        return (self.schema_cls, self.exclude) == (other.schema_cls, other.exclude)
+
+    def __hash__(self):
+        return hash((self.schema_cls, self.exclude))
+
+    def __repr__(self):
+        return "<SchemaVariant {} without {}>".format(
+            self.schema_cls.__name__, sorted(self.exclude)
+        )
+
+
+class _VariantOpts(object):
+    __slots__ = ("exclude",)
+
+    def __init__(self, exclude):
+        self.exclude = exclude
+
+
+def schema_class_resolver(marshmallow_plugin, schema, variant_cache=None):
     """
     Return best candidate class for a schema instance or cls.
     :param spec: Apispec instance
     :param schema: schema instance or cls
-    :return: best schema cls
+    :param variant_cache: VariantCache of the plugin, if any
+    :return: best schema cls, or SchemaVariant of it
     """
     if isinstance(schema, type):
         return schema
+    return resolve_variant_key(
+        marshmallow_plugin, get_variant_key(schema), variant_cache
+    )
 
-    # Get instance params
-    exclude = get_excluded_params(schema)
-
-    cls_schema = type(schema)
 
-    # generate id
-    schema_id = generate_id(schema, exclude)
+def resolve_variant_key(marshmallow_plugin, variant_key, variant_cache=None):
+    """
+    Return best candidate class for a variant key (see `get_variant_key`).
+    :param spec: Apispec instance
+    :param variant_key: (schema cls, only, exclude) tuple
+    :param variant_cache: VariantCache of the plugin, if any
+    :return: best schema cls, or SchemaVariant of it
+    """
+    cls_schema = variant_key[0]
+    if variant_cache is None:
+        fields = _get_variant_fields(*variant_key).fields
+    else:
+        fields = variant_cache.get_fields(variant_key).fields
+    exclude = {
+        str(field) for field in cls_schema._declared_fields if field not in fields
+    }
 
     # same as class schema ?
-    if generate_id(cls_schema) == schema_id:
+    if not exclude:
         return cls_schema
 
     # FIXME BS 2018-11-22: Must be in real code
     if not hasattr(marshmallow_plugin, "auto_generated_schemas"):
         marshmallow_plugin.auto_generated_schemas = {}
 
-    # already generated similar schema ?
-    if schema_id in marshmallow_plugin.auto_generated_schemas:
-        return marshmallow_plugin.auto_generated_schemas[schema_id]
-
-    # no similar schema found, create new one
-    class NewSchema(cls_schema):
-        pass
-
-    NewSchema.opts.exclude = exclude
-    NewSchema.__name__ = cls_schema.__name__
-    NewSchema._schema_name = "{}_{}".format(cls_schema.__name__, id(NewSchema))
-    marshmallow_plugin.auto_generated_schemas[schema_id] = NewSchema
-    return NewSchema
+    # already generated similar schema ? (keyed by variant, not by name, as
+    # distinct schema classes can have the same name)
+    variant = SchemaVariant(cls_schema, exclude)
+    return marshmallow_plugin.auto_generated_schemas.setdefault(variant, variant)
 
 
 def generate_schema_name(schema: marshmallow.Schema):
     """
-    Return best candidate name for one schema cls or instance.
-    :param schema: instance or cls schema
+    Return best candidate name for one schema cls, instance or variant.
+    :param schema: instance, cls or SchemaVariant schema
     :return: best schema name
     """
+    if isinstance(schema, SchemaVariant):
+        schema_name = "{}_without".format(schema.__name__)
+        for elem in sorted(schema.exclude):
+            schema_name = "{}_{}".format(schema_name, elem)
+        return schema_name
+
     if not isinstance(schema, type):
         schema = type(schema)
 
@@ -112,3 +445,65 @@ def generate_schema_name(schema: marshmallow.Schema):
         schema_name = schema.__name__
 
     return schema_name
+
+
+def get_schema_path(schema):
+    """
+    Return a deterministic (and unique in process) identifier of a schema
+    cls or variant: module, qualified name and excluded fields.
+    :param schema: cls or SchemaVariant schema
+    """
+    if isinstance(schema, SchemaVariant):
+        return "{}-{}".format(
+            get_schema_path(schema.schema_cls), ",".join(sorted(schema.exclude))
+        )
+    return "{}.{}".format(schema.__module__, schema.__qualname__)
+
+
+class SchemaNameIndex(object):
+    """
+    Memoized and collision checked schema names of a spec, which don't
+    depend on object ids. When schemas named by this index get the same name
+    (eg. schema classes with the same class name, in two modules), the first
+    named one gets the plain name, others are named after their name and a
+    digest of their module, qualified name and excluded fields (lengthened
+    until unique).
+    Variants are given to custom name resolvers as schema classes (see
+    `SchemaVariant.get_schema_class`).
+    :param name_resolver: schema name resolver, like `generate_schema_name`
+    """
+
+    def __init__(self, name_resolver=generate_schema_name):
+        self.name_resolver = name_resolver
+        self._names = {}
+        self._schemas = {}
+
+    def __call__(self, schema):
+        try:
+            return self._names[schema]
+        except KeyError:
+            pass
+
+        if (
+            isinstance(schema, SchemaVariant)
+            and self.name_resolver is not generate_schema_name
+        ):
+            # Custom resolvers may inspect schema classes (issubclass,
+            # declared fields, Meta, etc.)
+            name = self.name_resolver(schema.get_schema_class())
+        else:
+            name = self.name_resolver(schema)
+        if name is not None:
+            if self._schemas.get(name, schema) != schema:
+                name = self._get_digest_name(name, schema)
+            self._schemas[name] = schema
+        self._names[schema] = name
+        return name
+
+    def _get_digest_name(self, name, schema):
+        digest = hashlib.sha1(get_schema_path(schema).encode("utf-8")).hexdigest()
+        for length in range(8, len(digest), 4):
+            digest_name = "{}_{}".format(name, digest[:length])
+            if self._schemas.get(digest_name, schema) == schema:
+                return digest_name
+        return "{}_{}".format(name, digest)
@@ -1,10 +1,131 @@
 # coding: utf-8
+import collections
+
 from apispec.ext.marshmallow import OpenAPIConverter
+from apispec.ext.marshmallow.common import make_schema_key
+from apispec.ext.marshmallow.common import resolve_schema_instance
+import marshmallow
 
+from apispec_marshmallow_advanced.common import VariantCache
 from apispec_marshmallow_advanced.common import schema_class_resolver
 
 
+def contains_nested(field):
+    """
+    Return True if field is (or contains, as List, Tuple or Dict items) a
+    Nested field.
+    :param field: marshmallow field
+    """
+    pending = [field]
+    while pending:
+        field = pending.pop()
+        if isinstance(field, marshmallow.fields.Nested):
+            return True
+        for attribute in ("inner", "container", "value_field"):
+            inner = getattr(field, attribute, None)
+            if isinstance(inner, marshmallow.fields.Field):
+                pending.append(inner)
+        pending.extend(getattr(field, "tuple_fields", ()))
+    return False
+
+
+def get_declared_field(field):
+    """
+    Return the declared (class level) field of a schema instance field, shared
+    by the schema class and its only/exclude variants.
+    :param field: bound marshmallow field
+    :return: declared field, or None if field is not a schema field
+    """
+    schema = getattr(field, "parent", None)
+    if not isinstance(schema, marshmallow.Schema):
+        return None
+    return type(schema)._declared_fields.get(field.name)
+
+
+def _freeze_modifier(modifier):
+    """Return a hashable (and compact) value of a schema modifier"""
+    if not modifier:
+        return None
+    if isinstance(modifier, bool):
+        return modifier
+    return frozenset(modifier)
+
+
 class HapicOpenAPIConverter(OpenAPIConverter):
+    # Max count of cached field properties (least recently used ones are
+    # dropped first)
+    field_properties_cache_size = 256
+
+    def __init__(self, openapi_version, schema_name_resolver, spec, variant_cache=None):
+        super().__init__(openapi_version, schema_name_resolver, spec)
+        # Effective fields of schema variants (shared with plugin)
+        self.variant_cache = variant_cache or VariantCache()
+        # JSON properties of fields without nested schemas, keyed by declared
+        # field (and binding dependant attributes)
+        self._field_properties = collections.OrderedDict()
+        # Registered component name of each resolved schema class (or
+        # variant), with modifiers which are not part of variants
+        self._component_names = {}
+
     def resolve_schema_class(self, schema):
         """See parent method"""
-        return schema_class_resolver(self.spec, schema)
+        return schema_class_resolver(self.spec, schema, self.variant_cache)
+
+    def get_component_key(self, schema):
+        """
+        Return key of the component a schema is registered as: schemas
+        resolved to the same class or variant share their component (whatever
+        only/exclude params produced them), if other modifiers are equal.
+        :param schema: schema instance or cls
+        """
+        if isinstance(schema, type):
+            # Not instantiated: modifiers of a class are its Meta ones
+            modifiers = (schema.opts.load_only, schema.opts.dump_only, None)
+        else:
+            schema = resolve_schema_instance(schema)
+            modifiers = (schema.load_only, schema.dump_only, schema.partial)
+        return (self.resolve_schema_class(schema),) + tuple(
+            _freeze_modifier(modifier) for modifier in modifiers
+        )
+
+    def add_component_name(self, schema, name):
+        """
+        Record the component name of a registered schema, reused for equal
+        schemas (see `get_component_key`).
+        :param schema: schema instance or cls
+        :param name: component name
+        """
+        self._component_names.setdefault(self.get_component_key(schema), name)
+
+    def resolve_nested_schema(self, schema):
+        """See parent method. A schema equal to an already registered one
+        (eg. same variant from other only/exclude params) is referenced to
+        it, instead of being registered again with a suffixed name."""
+        schema_instance = resolve_schema_instance(schema)
+        schema_key = make_schema_key(schema_instance)
+        if schema_key not in self.refs:
+            name = self._component_names.get(self.get_component_key(schema_instance))
+            if name is not None:
+                self.refs[schema_key] = name
+        return super().resolve_nested_schema(schema_instance)
+
+    def field2property(self, field):
+        """See parent method. Properties of fields are computed once for a
+        schema and all its only/exclude variants (except for fields with
+        nested schemas, which depend on the spec refs).
+        Returned properties are shallow copies: their values are shared
+        between schemas and must not be modified."""
+        declared_field = get_declared_field(field)
+        if declared_field is None or contains_nested(field):
+            return super().field2property(field)
+
+        key = (declared_field, field.dump_only, field.load_only)
+        try:
+            ret = self._field_properties[key]
+        except KeyError:
+            ret = self._field_properties[key] = super().field2property(field)
+            if len(self._field_properties) > self.field_properties_cache_size:
+                self._field_properties.popitem(last=False)
+        else:
+            self._field_properties.move_to_end(key)
+        return dict(ret)
@@ -0,0 +1,74 @@
+# coding: utf-8
+import marshmallow
+
+from tests.test_schema_class_resolving import Assembly
+from tests.test_schema_class_resolving import Person
+from tests.utils import get_definitions
+
+
+class Vote(marshmallow.Schema):
+    voter = marshmallow.fields.Nested(Person)
+    choice = marshmallow.fields.String(
+        validate=marshmallow.validate.OneOf(["yes", "no"])
+    )
+    weight = marshmallow.fields.Integer(dump_only=True)
+    tags = marshmallow.fields.List(marshmallow.fields.String())
+
+
+class TestFieldPropertiesCache(object):
+    def test_variants_reuse_field_properties(self, spec, monkeypatch):
+        converter = spec.plugins[0].openapi
+        converted = []
+        parent_field2property = type(converter).__bases__[0].field2property
+
+        def field2property(self, field):
+            converted.append(field.name)
+            return parent_field2property(self, field)
+
+        monkeypatch.setattr(
+            type(converter).__bases__[0], "field2property", field2property
+        )
+
+        spec.components.schema("Vote", schema=Vote)
+        spec.components.schema("VoteChoice", schema=Vote(only=("choice", "tags")))
+        spec.components.schema("VoteWeight", schema=Vote(exclude=("voter",)))
+
+        # Simple fields (and list items) are converted once
+        assert 1 == converted.count("choice")
+        assert 1 == converted.count("weight")
+        # List field and its items field
+        assert 2 == converted.count("tags")
+        definitions = get_definitions(spec)
+        assert definitions["Vote"]["properties"]["choice"] == (
+            definitions["VoteChoice"]["properties"]["choice"]
+        )
+        assert definitions["VoteWeight"]["properties"]["weight"]["readOnly"]
+
+    def test_cached_properties_are_copies(self, spec):
+        spec.components.schema("Vote", schema=Vote)
+        spec.components.schema("VoteChoice", schema=Vote(only=("choice",)))
+        definitions = get_definitions(spec)
+        assert ["yes", "no"] == definitions["VoteChoice"]["properties"]["choice"][
+            "enum"
+        ]
+        # Shallow copies: property values are shared
+        choice_property = definitions["Vote"]["properties"]["choice"]
+        assert choice_property is not definitions["VoteChoice"]["properties"]["choice"]
+        assert choice_property["enum"] is (
+            definitions["VoteChoice"]["properties"]["choice"]["enum"]
+        )
+
+    def test_cache_size_is_limited(self, spec, monkeypatch):
+        converter = spec.plugins[0].openapi
+        monkeypatch.setattr(converter, "field_properties_cache_size", 2)
+        spec.components.schema("Vote", schema=Vote)
+
+        # choice, weight and tags (and its items) fields were converted
+        assert 2 == len(converter._field_properties)
+
+    def test_nested_fields_are_not_cached(self, spec):
+        spec.components.schema("Assembly", schema=Assembly)
+        properties = get_definitions(spec)["Assembly"]["properties"]
+        assert properties["deputies"]["items"]["$ref"].endswith(
+            "Person_without_phone_number"
+        )
@@ -0,0 +1,65 @@
+# coding: utf-8
+import marshmallow
+
+from apispec_marshmallow_advanced.common import generate_id
+from apispec_marshmallow_advanced.common import get_variant_key
+from tests.conftest import make_spec
+from tests.test_schema_class_resolving import Address
+from tests.test_schema_class_resolving import Assembly
+from tests.test_schema_class_resolving import Author
+from tests.test_schema_class_resolving import Person
+from tests.utils import get_definitions
+
+
+class Parliament(marshmallow.Schema):
+    assemblies = marshmallow.fields.List(marshmallow.fields.Nested(Assembly))
+    speaker = marshmallow.fields.Nested(Person, only=("last_name",))
+    parent = marshmallow.fields.Nested("self", exclude=("parent",))
+
+
+class TestPrepare(object):
+    def test_prepare_resolves_nested_variants(self, spec):
+        plugin = spec.plugins[0]
+        resolved = plugin.prepare([Parliament])
+
+        assert {
+            "Parliament",
+            "Parliament_without_parent",
+            "Assembly",
+            "Person",
+            "Person_without_phone_number",
+            "Person_without_first_name_phone_number",
+        } == set(resolved.values())
+        variants = dict(spec.auto_generated_schemas)
+
+        spec.components.schema("Parliament", schema=Parliament)
+        # Registration reused prepared variants
+        assert variants == spec.auto_generated_schemas
+        assert {
+            "Parliament",
+            "Parliament_without_parent",
+            "Assembly",
+            "Person",
+            "Person_without_phone_number",
+            "Person_without_first_name_phone_number",
+        } == set(get_definitions(spec))
+
+    def test_prepared_variants_kept_per_plugin(self, spec):
+        variant_cache = spec.plugins[0].variant_cache
+        variant_cache.cache_size = 1
+        spec.plugins[0].prepare([Parliament])
+
+        key = get_variant_key(Person(exclude=("phone_number",)))
+        fields = variant_cache.get_fields(key)
+        # Not prepared variants are bounded, prepared ones are not dropped
+        variant_cache.get_fields(get_variant_key(Address))
+        variant_cache.get_fields(get_variant_key(Author))
+        assert 1 == len(variant_cache._fields)
+        assert fields is variant_cache.get_fields(key)
+        assert key not in make_spec("3.0.0").marshmallow_plugin.variant_cache._prepared
+
+    def test_generate_id(self):
+        assert "Person(_first_name_last_name_phone_number)" == generate_id(Person)
+        assert "Person(_first_name_last_name)" == generate_id(
+            Person(), exclude=["phone_number"]
+        )
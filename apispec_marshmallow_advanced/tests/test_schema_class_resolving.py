@@ -1,6 +1,19 @@
 # coding: utf-8
+import hashlib
+import warnings
+
+from apispec import APISpec
 import marshmallow
 
+from apispec_marshmallow_advanced import MarshmallowAdvancedPlugin
+from apispec_marshmallow_advanced.common import SchemaNameIndex
+from apispec_marshmallow_advanced.common import SchemaVariant
+from apispec_marshmallow_advanced.common import generate_schema_name
+from apispec_marshmallow_advanced.common import get_excluded_params
+from apispec_marshmallow_advanced.common import get_schema_path
+from apispec_marshmallow_advanced.common import get_variant_key
+from apispec_marshmallow_advanced.common import get_variant_tree
+from tests.conftest import make_spec
 from tests.utils import get_definitions
 
 
@@ -21,3 +34,239 @@ class TestSchemaClassResolving(object):
         definitions = get_definitions(spec)
 
         pass
+
+    def test_unit__variant__ok__no_schema_class_created(self, spec):
+        registry_size = len(marshmallow.class_registry._registry)
+        resolver = spec.plugins[0].openapi.resolve_schema_class
+
+        variant = resolver(Person(exclude=("phone_number",)))
+        assert isinstance(variant, SchemaVariant)
+        assert Person is variant.schema_cls
+        assert variant is resolver(Person(only=("first_name", "last_name")))
+        assert Person is resolver(Person())
+        assert registry_size == len(marshmallow.class_registry._registry)
+        assert "Person_without_phone_number" == generate_schema_name(variant)
+
+    def test_unit__reference_with_exclude__ok__variant_registered(self, spec):
+        spec.components.schema("assembly", schema=Assembly)
+        definitions = get_definitions(spec)
+
+        assert {"first_name", "last_name"} == set(
+            definitions["Person_without_phone_number"]["properties"]
+        )
+
+    def test_unit__custom_name_resolver__ok__schema_class_given(self):
+        resolved = {}
+
+        def name_resolver(schema_cls):
+            name = "_".join((schema_cls.__name__,) + schema_cls.opts.exclude)
+            resolved[name] = schema_cls
+            return name
+
+        registry_size = len(marshmallow.class_registry._registry)
+        spec = APISpec(
+            title="Custom names",
+            version="0.1",
+            openapi_version="3.0.0",
+            plugins=(MarshmallowAdvancedPlugin(schema_name_resolver=name_resolver),),
+        )
+        spec.components.schema("assembly", schema=Assembly)
+
+        assert name_resolver is spec.plugins[0].schema_name_resolver
+        assert "Person_phone_number" in get_definitions(spec)
+        schema_cls = resolved["Person_phone_number"]
+        assert issubclass(schema_cls, Person)
+        assert set(Person._declared_fields) == set(schema_cls._declared_fields)
+        assert "phone_number" not in schema_cls().fields
+        assert "Person_without_phone_number" == generate_schema_name(schema_cls)
+        assert registry_size == len(marshmallow.class_registry._registry)
+
+
+class Address(marshmallow.Schema):
+    city = marshmallow.fields.String()
+    street = marshmallow.fields.String()
+
+
+class Author(marshmallow.Schema):
+    name = marshmallow.fields.String()
+    email = marshmallow.fields.String()
+    address = marshmallow.fields.Nested(Address)
+
+
+class Book(marshmallow.Schema):
+    title = marshmallow.fields.String()
+    author = marshmallow.fields.Nested(Author)
+    co_authors = marshmallow.fields.List(
+        marshmallow.fields.Nested(Author, exclude=("address",))
+    )
+
+
+class Comment(marshmallow.Schema):
+    text = marshmallow.fields.String()
+    author = marshmallow.fields.Nested(Author)
+
+
+class Post(marshmallow.Schema):
+    title = marshmallow.fields.String()
+    comments = marshmallow.fields.List(marshmallow.fields.Nested(Comment))
+
+
+class Library(marshmallow.Schema):
+    addresses = marshmallow.fields.Dict(
+        values=marshmallow.fields.Nested(Address, exclude=("street",))
+    )
+    best_seller = marshmallow.fields.Tuple(
+        (marshmallow.fields.String(), marshmallow.fields.Nested(Author, only=("name",)))
+    )
+
+
+class TestNestedVariants(object):
+    def test_unit__excluded_params__ok__dotted_paths_ignored(self):
+        book = Book(exclude=("author.email", "author.address.city"))
+        assert set() == get_excluded_params(book)
+        assert {"email"} == get_excluded_params(book.fields["author"].schema)
+
+    def test_unit__variant_tree__ok__same_keys_as_nested_instances(self):
+        book = Book(
+            only=("title", "author.name", "author.address", "co_authors"),
+            exclude=("author.address.city",),
+        )
+        tree = get_variant_tree(book)
+
+        author = book.fields["author"].schema
+        address = author.fields["address"].schema
+        co_author = book.fields["co_authors"].inner.schema
+        assert {
+            get_variant_key(book),
+            get_variant_key(author),
+            get_variant_key(address),
+            get_variant_key(co_author),
+        } == set(tree)
+        assert {"name", "address"} == tree[get_variant_key(author)].fields
+        assert {"street"} == tree[get_variant_key(address)].fields
+        assert {"name", "email"} == tree[get_variant_key(co_author)].fields
+
+    def test_unit__variant_tree__ok__deep_only_paths(self):
+        post = Post(only=("comments.author.name", "comments.text"))
+        tree = get_variant_tree(post)
+
+        comment = post.fields["comments"].inner.schema
+        author = comment.fields["author"].schema
+        assert {
+            get_variant_key(post),
+            get_variant_key(comment),
+            get_variant_key(author),
+        } == set(tree)
+        assert {"text", "author"} == tree[get_variant_key(comment)].fields
+        assert {"name"} == tree[get_variant_key(author)].fields
+
+    def test_unit__variant_tree__ok__dict_values_and_tuple_items(self):
+        library = Library(exclude=("addresses.city",))
+        tree = get_variant_tree(library)
+
+        address = library.fields["addresses"].value_field.schema
+        author = library.fields["best_seller"].tuple_fields[1].schema
+        assert {
+            get_variant_key(library),
+            get_variant_key(address),
+            get_variant_key(author),
+        } == set(tree)
+        assert set() == tree[get_variant_key(address)].fields
+        assert {"name"} == tree[get_variant_key(author)].fields
+
+    def test_unit__prepare__ok__dict_values_and_tuple_items(self, spec):
+        resolved = spec.plugins[0].prepare([Library])
+
+        assert {
+            "Library",
+            "Address_without_street",
+            "Author_without_address_email",
+        } == set(resolved.values())
+
+    def test_unit__prepare__ok__nested_variants_of_dotted_paths(self, spec):
+        resolved = spec.plugins[0].prepare(
+            [Book(exclude=("author.email", "author.address.city"))]
+        )
+
+        assert {
+            "Book",
+            "Author_without_email",
+            "Author_without_address",
+            "Address_without_city",
+        } == set(resolved.values())
+
+
+class Shelf(marshmallow.Schema):
+    author = marshmallow.fields.Nested(Author, exclude=("email",))
+    editor = marshmallow.fields.Nested(Author, only=("name", "address"))
+
+
+def make_other_person():
+    class Person(marshmallow.Schema):
+        first_name = marshmallow.fields.String()
+        last_name = marshmallow.fields.String()
+        phone_number = marshmallow.fields.String()
+
+    return Person
+
+
+class TestSchemaNames(object):
+    def test_unit__names__ok__same_class_name(self, spec):
+        other_person = make_other_person()
+        resolver = spec.plugins[0].openapi.resolve_schema_class
+        name_resolver = spec.plugins[0].schema_names
+
+        variant = resolver(Person(exclude=("phone_number",)))
+        other_variant = resolver(other_person(exclude=("phone_number",)))
+        assert variant is not other_variant
+        assert other_person is other_variant.schema_cls
+
+        assert "Person" == name_resolver(Person)
+        assert "Person_without_phone_number" == name_resolver(variant)
+        other_name = name_resolver(other_person)
+        other_variant_name = name_resolver(other_variant)
+        assert other_name.startswith("Person_")
+        assert other_variant_name.startswith("Person_without_phone_number_")
+        assert other_name != other_variant_name
+        # Memoized
+        assert other_name is name_resolver(other_person)
+
+    def test_unit__names__ok__deterministic(self):
+        other_person = make_other_person()
+        names = []
+        for _ in range(2):
+            name_resolver = make_spec("3.0.0").marshmallow_plugin.schema_names
+            name_resolver(Person)
+            names.append(name_resolver(other_person))
+        assert names[0] == names[1]
+
+    def test_unit__names__ok__homonyms_out_of_spec_ignored(self, spec):
+        class Person(marshmallow.Schema):
+            # Would be first (sorted by module) of homonyms in marshmallow
+            # class registry
+            __module__ = "a_models"
+            name = marshmallow.fields.String()
+
+        spec.components.schema("assembly", schema=Assembly)
+        assert {"assembly", "Person", "Person_without_phone_number"} == set(
+            get_definitions(spec)
+        )
+
+    def test_unit__names__ok__digest_names_checked(self):
+        digest = hashlib.sha1(get_schema_path(Book).encode("utf-8")).hexdigest()
+        names = {Author: "Writing", Book: "Writing", Address: "Writing_" + digest[:8]}
+        name_resolver = SchemaNameIndex(names.get)
+
+        assert "Writing_" + digest[:8] == name_resolver(Address)
+        assert "Writing" == name_resolver(Author)
+        assert "Writing_" + digest[:12] == name_resolver(Book)
+
+    def test_unit__components__ok__equal_variants_share_component(self, spec):
+        with warnings.catch_warnings():
+            warnings.filterwarnings("error", message="Multiple schemas")
+            spec.components.schema("Shelf", schema=Shelf)
+        definitions = get_definitions(spec)
+
+        assert {"Shelf", "Author_without_email", "Address"} == set(definitions)
+        properties = definitions["Shelf"]["properties"]
+        assert properties["author"] == properties["editor"]
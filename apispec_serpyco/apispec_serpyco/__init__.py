@@ -3,11 +3,23 @@
 to `APISpec.definition <apispec.APISpec.definition>`
 and `APISpec.path <apispec.APISpec.path>` (for responses). Note serpyco field type is supported.
 """
-import serpyco
+import copy
+import hashlib
+import json
+import threading
+import time
+import weakref
+
 from apispec import BasePlugin
+from apispec.exceptions import DuplicateComponentNameError
 from serpyco.schema import default_get_definition_name
 
 from apispec_serpyco.openapi import OpenAPIConverter
+from apispec_serpyco.operations import OperationIndex
+from apispec_serpyco.refs import path_to_ref
+from apispec_serpyco.registry import SchemaBuilderRegistry
+from apispec_serpyco.utils import copy_json
+from apispec_serpyco.validation import ValidatorCompiler
 
 
 def extract_definitions_from_json_schema(definition):
@@ -30,6 +42,11 @@ def replace_refs_for_openapi3(data):
     for key, value in data.items():
         if isinstance(value, dict):
             replace_refs_for_openapi3(value)
+        elif isinstance(value, list):
+            # Like "anyOf" (optional properties) or tuple "items"
+            for item in value:
+                if isinstance(item, dict):
+                    replace_refs_for_openapi3(item)
         elif key == "$ref" and value.startswith("#/definitions"):
             data[key] = value.replace("#/definitions", "#/components/schemas")
 
@@ -142,6 +159,10 @@ def replace_auto_refs(schema_name, data, openapi_version):
     for key, value in data.items():
         if isinstance(value, dict):
             replace_auto_refs(schema_name, value, openapi_version)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    replace_auto_refs(schema_name, item, openapi_version)
         elif key == "$ref" and value == "#":
             if openapi_version.major < 3:
                 data[key] = "#/definitions/{}".format(schema_name)
@@ -149,28 +170,124 @@ def replace_auto_refs(schema_name, data, openapi_version):
                 data[key] = "#/components/schemas/{}".format(schema_name)
 
 
+def get_content_hash(definition):
+    """Return a hash of a schema definition content"""
+    return hashlib.sha256(
+        json.dumps(definition, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
 class SerpycoPlugin(BasePlugin):
-    """APISpec plugin handling python dataclass (with serpyco typing support)"""
+    """APISpec plugin handling python dataclass (with serpyco typing support)
+
+    One plugin can be given to several specs: it is attached to the first one,
+    and other specs get a copy of it (see `for_spec`) with their own refs and
+    registrations. All copies share the builder registry, so each dataclass is
+    converted once for all specs.
+
+    :param schema_name_resolver: nested definitions name resolver
+    :param SchemaBuilderRegistry builder_registry: cache of serpyco builders,
+        default is a registry of this plugin (and its copies). Give the
+        process wide `apispec_serpyco.registry.default_registry` to share it
+        with other plugins and runtime serializers
+    """
 
-    def __init__(self, schema_name_resolver=default_get_definition_name):
+    def __init__(
+        self, schema_name_resolver=default_get_definition_name, builder_registry=None
+    ):
         super(SerpycoPlugin, self).__init__()
         self.spec = None
         # self.schema_name_resolver = schema_name_resolver
         self.openapi_version = None
         self.openapi = None
         self.schema_name_resolver = schema_name_resolver
+        if builder_registry is None:
+            builder_registry = SchemaBuilderRegistry()
+        self.builder_registry = builder_registry
+        # Conversion duration (in seconds) of each registered dataclass,
+        # keyed by component name
+        self.conversion_times = {}
+        # Content hash of each schema component registered in spec, keyed by
+        # name (check and registration are done under lock)
+        self._component_hashes = {}
+        # Registry definition (shared, not converted) of each nested
+        # definition registered in spec, keyed by name
+        self._registered_definitions = {}
+        self._components_lock = threading.RLock()
+        # Plugin instance attached to each spec (shared by copies)
+        self._spec_plugins = weakref.WeakKeyDictionary()
+        # Compiled validators of schema components (see `get_validator`)
+        self._validator_compiler = None
+        # Registered operations, indexed by path, operationId and tag
+        self.operations = OperationIndex()
 
     def init_spec(self, spec):
         """Initialize plugin with APISpec object
 
+        If plugin is already attached to another spec, a copy of it is attached
+        to given spec instead (and replaces it in spec plugins).
+
         :param APISpec spec: APISpec object this plugin instance is attached to
         """
+        if self.spec is not None and self.spec is not spec:
+            plugin = self._spec_plugins.get(spec)
+            if plugin is None:
+                plugin = self._copy_for_spec()
+                plugin.init_spec(spec)
+            # Components are created from spec plugins after their init_spec
+            spec.plugins = tuple(
+                plugin if spec_plugin is self else spec_plugin
+                for spec_plugin in spec.plugins
+            )
+            return
+
         super(SerpycoPlugin, self).init_spec(spec)
+        self._spec_plugins[spec] = self
         self.spec = spec
         self.openapi_version = spec.openapi_version
         self.openapi = OpenAPIConverter(
             openapi_version=spec.openapi_version,
             schema_name_resolver=self.schema_name_resolver,
+            builder_registry=self.builder_registry,
+        )
+
+    def _copy_for_spec(self):
+        plugin = copy.copy(self)
+        plugin.spec = None
+        plugin.openapi_version = None
+        plugin.openapi = None
+        plugin.conversion_times = {}
+        plugin._component_hashes = {}
+        plugin._registered_definitions = {}
+        plugin._components_lock = threading.RLock()
+        plugin._validator_compiler = None
+        plugin.operations = OperationIndex()
+        return plugin
+
+    def for_spec(self, spec):
+        """Return the plugin instance attached to given spec
+
+        :param APISpec spec: spec this plugin (or one of its copies) is
+            attached to
+        """
+        return self._spec_plugins[spec]
+
+    def get_validator(self, name):
+        """Return a validation callable of a schema component, compiled once
+        (with its references) and cached
+
+        The validator takes data (as loaded from json) and raises
+        `apispec_serpyco.validation.ValidationError` if data doesn't match
+        the component schema, as registered in spec.
+
+        :param str name: schema component name
+        :raise KeyError: if no schema component has this name
+        """
+        if self._validator_compiler is None:
+            self._validator_compiler = ValidatorCompiler(self.spec)
+        ref_path = self.openapi.get_ref_path().split("/")
+        return self._validator_compiler.get_validator(
+            path_to_ref(tuple(ref_path) + (name,))
         )
 
     def schema_helper(self, name, component=None, schema=None, **kwargs):
@@ -182,20 +299,30 @@ class SerpycoPlugin(BasePlugin):
         with_definition = kwargs.get("with_definition")
 
         if schema is None and not with_definition:
+            # Schema registered without this plugin
+            with self._components_lock:
+                self._component_hashes[name] = get_content_hash(component or {})
             return None
 
         if with_definition:
             return with_definition
 
+        start = time.perf_counter()
         # Store registered refs, keyed by Schema class
         self.openapi.refs[schema] = name
+        self.openapi.clear_batch_cache()
 
-        builder = serpyco.SchemaBuilder(
+        shared_json_schema = self.builder_registry.get_json_schema(
             schema,
             get_definition_name=self.schema_name_resolver,
             **kwargs.get("serpyco_builder_args", {}),
         )
-        json_schema = builder.json_schema()
+        # Clean json_schema (to be OpenAPI compatible)
+        json_schema = {
+            key: copy_json(value)
+            for key, value in shared_json_schema.items()
+            if key not in ("definitions", "$schema")
+        }
 
         if self.openapi_version.major > 2:
             replace_refs_for_openapi3(json_schema["properties"])
@@ -205,23 +332,51 @@ class SerpycoPlugin(BasePlugin):
         replace_auto_refs(name, json_schema["properties"], self.openapi_version)
 
         # If definitions in json_schema, add them
-        if json_schema.get("definitions"):
-            flat_definitions = extract_definitions_from_json_schema(json_schema)
-            for name, definition in flat_definitions.items():
-
-                # Test if schema not already in schema lists
-                # FIXME BS 2019-01-31: We must take a look into _schemas attribute to prevent
-                # apispec.exceptions.DuplicateComponentNameError raise. See #14.
-                if name not in self.spec.components._schemas:
-                    # To be OpenAPI compliant, we must manage ourself required properties
-                    manage_optional_properties(definition)
-                    self.spec.components.schema(name, with_definition=definition)
+        if shared_json_schema.get("definitions"):
+            flat_definitions = extract_definitions_from_json_schema(shared_json_schema)
+            for definition_name, shared_definition in flat_definitions.items():
+                if self._registered_definitions.get(definition_name) is (
+                    shared_definition
+                ):
+                    # Registry definitions are shared by the json schemas
+                    # nesting them: this one is already registered
+                    continue
+                definition = copy_json(shared_definition)
+                if self.openapi_version.major > 2:
+                    replace_refs_for_openapi3(definition)
+                # To be OpenAPI compliant, we must manage ourself required properties
+                manage_optional_properties(definition)
+                self._register_definition(definition_name, definition)
+                self._registered_definitions[definition_name] = shared_definition
+
+        with self._components_lock:
+            self._component_hashes[name] = get_content_hash(json_schema)
+        # Nested definitions conversion time is included in this one
+        self.conversion_times[name] = time.perf_counter() - start
+        return json_schema
 
-        # Clean json_schema (to be OpenAPI compatible)
-        json_schema.pop("definitions", None)
-        json_schema.pop("$schema", None)
+    def _register_definition(self, name, definition):
+        """Register a nested definition in spec, unless the same one is
+        already registered
 
-        return json_schema
+        :raise DuplicateComponentNameError: if another definition is registered
+            with this name
+        """
+        content_hash = get_content_hash(definition)
+        with self._components_lock:
+            registered_hash = self._component_hashes.get(name)
+            if registered_hash == content_hash:
+                return
+            if registered_hash is not None:
+                raise DuplicateComponentNameError(
+                    'Another schema with name "{}" is already registered'.format(name)
+                )
+            self._component_hashes[name] = content_hash
+            try:
+                self.spec.components.schema(name, with_definition=definition)
+            except Exception:
+                del self._component_hashes[name]
+                raise
 
     def parameter_helper(self, component=None, **kwargs):
         """Parameter component helper that allows using a dataclass
@@ -242,7 +397,8 @@ class SerpycoPlugin(BasePlugin):
         return kwargs
 
     def operation_helper(self, path=None, operations=None, **kwargs):
-        """May mutate operations.
+        """May mutate operations. Operations are indexed in `operations`
+        attribute (see `apispec_serpyco.operations.OperationIndex`).
 
         :param str path: Path to the resource
         :param dict operations: A `dict` mapping HTTP methods to operation object.
@@ -259,6 +415,29 @@ class SerpycoPlugin(BasePlugin):
                     self.resolve_schema_in_request_body(operation["requestBody"])
             for response in operation.get("responses", {}).values():
                 self.resolve_schema(response)
+        # Indexed once resolved: a failing path is not indexed
+        self.operations.add(path, operations)
+
+    def register_paths(self, paths):
+        """Register many paths in spec (see `APISpec.path`)
+
+        Dataclasses used by several operations are resolved once for the whole
+        batch.
+
+        :param paths: iterable of (path, operations) pairs or of `APISpec.path`
+            keyword arguments dicts
+        :return: spec
+        """
+        self.openapi.start_batch()
+        try:
+            for path in paths:
+                if isinstance(path, dict):
+                    self.spec.path(**path)
+                else:
+                    self.spec.path(*path)
+        finally:
+            self.openapi.end_batch()
+        return self.spec
 
     def resolve_schema_in_request_body(self, request_body):
         """Function to resolve a schema in a requestBody object - modifies then
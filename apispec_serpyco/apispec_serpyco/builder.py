@@ -0,0 +1,189 @@
+# coding: utf-8
+"""Deferred spec building: schemas and paths registrations are recorded, then
+converted later, all at once or step by step."""
+import asyncio
+import collections
+import functools
+import time
+
+PendingStep = collections.namedtuple("PendingStep", ("kind", "name", "run"))
+PendingStep.__doc__ = """One recorded registration
+
+:param str kind: "schema" or "path"
+:param str name: component name or path
+:param run: callable doing the registration
+"""
+
+# Python < 3.7: event loop of a running coroutine
+_get_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+BuildProgress = collections.namedtuple("BuildProgress", ("done", "total", "step"))
+BuildProgress.__doc__ = """Spec build progress
+
+:param int done: count of run registrations
+:param int total: count of recorded registrations (run or not)
+:param PendingStep step: last run registration
+"""
+
+
+class SpecBuilder(object):
+    """Record schemas and paths registrations of a spec to run them later
+
+    Registrations are the same as `APISpec.components.schema` and
+    `APISpec.path` ones, so dataclass conversion is done by spec plugins
+    (eg. `SerpycoPlugin`) as usual, but only when building.
+
+    :param APISpec spec: spec to build
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self._pending = collections.deque()
+        self._done_count = 0
+
+    def schema(self, name, component=None, **kwargs):
+        """Record a schema registration (see `APISpec.components.schema`)"""
+        self._add_step(
+            "schema",
+            name,
+            functools.partial(self.spec.components.schema, name, component, **kwargs),
+        )
+        return self
+
+    def path(self, path=None, operations=None, **kwargs):
+        """Record a path registration (see `APISpec.path`)"""
+        self._add_step(
+            "path", path, functools.partial(self.spec.path, path, operations, **kwargs)
+        )
+        return self
+
+    def _add_step(self, kind, name, run):
+        self._pending.append(PendingStep(kind, name, run))
+
+    @property
+    def pending_count(self):
+        """Count of registrations not run yet"""
+        return len(self._pending)
+
+    def run_next(self):
+        """Run next recorded registration
+
+        A registration raising an error is kept, so it is run again by next
+        call.
+
+        :return: run PendingStep, or None if there was nothing to run
+        """
+        try:
+            step = self._pending[0]
+        except IndexError:
+            return None
+        step.run()
+        self._pending.popleft()
+        self._done_count += 1
+        return step
+
+    def iter_build(self):
+        """Run recorded registrations one by one, as a generator
+
+        Each iteration converts one schema (with its nested dataclasses) or one
+        path (with its operations). Generator can be left at any time: next
+        one continues where it stopped.
+
+        :return: generator of BuildProgress
+        """
+        while True:
+            step = self.run_next()
+            if step is None:
+                return
+            yield BuildProgress(
+                self._done_count, self._done_count + len(self._pending), step
+            )
+
+    def run_for(self, seconds):
+        """Run recorded registrations during (about) given time
+
+        :param float seconds: time budget; a started registration is always
+            finished, so it can be exceeded
+        :return: last BuildProgress, or None if there was nothing to run
+        """
+        deadline = time.perf_counter() + seconds
+        progress = None
+        for progress in self.iter_build():
+            if time.perf_counter() >= deadline:
+                break
+        return progress
+
+    def build(self):
+        """Run all recorded registrations
+
+        :return: built spec
+        """
+        for _ in self.iter_build():
+            pass
+        return self.spec
+
+
+class AsyncSpecBuilder(SpecBuilder):
+    """SpecBuilder running registrations in an executor, without blocking the
+    event loop.
+
+    Concurrent `get_spec` calls share the same build, and the built spec is
+    cached until a new registration is recorded. A failed build is not
+    cached: next `get_spec` call runs the failed registration again.
+
+    :param APISpec spec: spec to build
+    :param executor: concurrent.futures executor, default is the event loop one
+    :param int chunk_size: count of registrations run in executor at once,
+        control is given back to the event loop between chunks
+    """
+
+    def __init__(self, spec, executor=None, chunk_size=1):
+        super(AsyncSpecBuilder, self).__init__(spec)
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self._build_future = None
+        self._spec_dict = None
+
+    def _add_step(self, kind, name, run):
+        super(AsyncSpecBuilder, self)._add_step(kind, name, run)
+        # New registration: built spec is outdated
+        if self._build_future is not None and self._build_future.done():
+            self._build_future = None
+            self._spec_dict = None
+
+    def _run_chunk(self):
+        for _ in range(self.chunk_size):
+            if self.run_next() is None:
+                break
+
+    async def _build(self):
+        loop = _get_running_loop()
+        while self._pending:
+            await loop.run_in_executor(self.executor, self._run_chunk)
+        return self.spec
+
+    def _forget_failed_build(self, future):
+        if future.cancelled() or future.exception() is not None:
+            if self._build_future is future:
+                self._build_future = None
+
+    async def get_spec(self):
+        """Build spec (or wait for the build in progress)
+
+        :return: built spec
+        """
+        if self._build_future is None:
+            self._build_future = asyncio.ensure_future(self._build())
+            self._build_future.add_done_callback(self._forget_failed_build)
+        # Shield the shared build from one waiter cancellation
+        return await asyncio.shield(self._build_future)
+
+    async def get_spec_dict(self):
+        """Build spec (or wait for the build in progress)
+
+        :return: built spec dict, cached
+        """
+        spec = await self.get_spec()
+        if self._spec_dict is None:
+            self._spec_dict = spec.to_dict()
+        return self._spec_dict
@@ -0,0 +1,124 @@
+# coding: utf-8
+"""Canonical json encoding of specs, with optional faster backends.
+
+Canonical output is the stdlib one with sorted keys, compact separators and
+utf-8 (non escaped) characters. `python-rapidjson` or `orjson`, when installed,
+are used to produce it faster. When a backend could produce a different output
+(float formatting, escaping, non-string keys, etc.), encoding falls back to
+stdlib, so the output is always identical whatever the installed backends.
+
+`orjson` can't tell apart nulls from non finite floats in its output, so it
+falls back to stdlib for specs containing null values (not "nullable" keys).
+"""
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import rapidjson
+except ImportError:  # pragma: no cover
+    rapidjson = None
+
+BACKENDS = ("rapidjson", "orjson", "json")
+
+# orjson output parts which may differ from stdlib: floats with an exponent
+# (written 1e20, 1e-7 instead of 1e+20, 1e-07), small floats (0.00001 instead
+# of 1e-05) and non finite floats (written null). Patterns start with a
+# literal so they are searched fast, context is checked on matches only
+_ORJSON_EXPONENT = re.compile(rb"e-?[0-9]")
+_ORJSON_SMALL_FLOAT = b"0.0000"
+_NUMBER_CHARACTERS = b"-.0123456789"
+# Characters before a json value
+_VALUE_PREFIXES = b":,["
+# rapidjson writes control characters escapes in uppercase
+_RAPIDJSON_UNSAFE = b"\\u00"
+
+
+def _dumps_json(data):
+    return json.dumps(
+        data,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        allow_nan=False,
+    ).encode("utf-8")
+
+
+def _dumps_orjson(data):
+    try:
+        serialized = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    except TypeError:  # Non string keys, big integers, etc.
+        return None
+    if not _is_orjson_output_canonical(serialized):
+        return None
+    return serialized
+
+
+def _is_orjson_output_canonical(serialized):
+    if _ORJSON_SMALL_FLOAT in serialized:
+        return False
+    for match in _ORJSON_EXPONENT.finditer(serialized):
+        # Exponent of a number value, not of a string content
+        start = match.start()
+        while start and serialized[start - 1] in _NUMBER_CHARACTERS:
+            start -= 1
+        if start < match.start() and (
+            not start or serialized[start - 1] in _VALUE_PREFIXES
+        ):
+            return False
+    start = serialized.find(b"null")
+    while start != -1:
+        if not start or serialized[start - 1] in _VALUE_PREFIXES:
+            return False
+        start = serialized.find(b"null", start + 4)
+    return True
+
+
+def _dumps_rapidjson(data):
+    try:
+        serialized = rapidjson.dumps(
+            data,
+            sort_keys=True,
+            ensure_ascii=False,
+            number_mode=rapidjson.NM_NONE,
+        ).encode("utf-8")
+    except (TypeError, ValueError):
+        return None
+    if _RAPIDJSON_UNSAFE in serialized:
+        return None
+    return serialized
+
+
+_DUMPS = {"orjson": _dumps_orjson, "rapidjson": _dumps_rapidjson}
+
+
+def available_backends():
+    """Return names of installed backends, fastest first"""
+    modules = {"orjson": orjson, "rapidjson": rapidjson}
+    return tuple(
+        name for name in BACKENDS if name == "json" or modules[name] is not None
+    )
+
+
+def dumps_canonical(data, backend=None):
+    """Serialize json data into canonical json bytes
+
+    :param data: json data (eg. a spec dict)
+    :param str backend: one of `available_backends()`, default is the fastest
+        one
+    :return: utf-8 encoded json bytes
+    :raise ValueError: if data contains non finite floats
+    """
+    backend = backend or available_backends()[0]
+    if backend not in available_backends():
+        raise ValueError('JSON backend "{}" is not available'.format(backend))
+
+    if backend != "json":
+        serialized = _DUMPS[backend](data)
+        if serialized is not None:
+            return serialized
+    return _dumps_json(data)
@@ -0,0 +1,163 @@
+# coding: utf-8
+"""Build partial specs: only some paths or tags, or only referenced
+components, always with the components they transitively reference."""
+from apispec_serpyco.refs import get_ref_target
+from apispec_serpyco.refs import ref_closure
+
+# Path item keys which are not operations
+_PATH_ITEM_FIELDS = ("summary", "description", "servers", "parameters")
+# Security schemes are referenced by name, not with "$ref": always keep them
+_SECURITY_SECTIONS = ("securityDefinitions", "securitySchemes")
+
+
+def select_paths(spec_dict, paths=None, tags=None):
+    """Return path items matching given paths or tags
+
+    An operation is selected if its path is in `paths` or if it has one of
+    `tags`. When neither `paths` or `tags` is given, all paths are selected.
+
+    :param dict spec_dict: spec dict
+    :param paths: path templates to select, like "/pets/{pet_id}"
+    :param tags: operation tags to select
+    :return: dict of selected path items
+    """
+    if paths is None and tags is None:
+        return dict(spec_dict.get("paths", {}))
+
+    paths = set(paths or ())
+    tags = set(tags or ())
+    selected = {}
+    for path, path_item in spec_dict.get("paths", {}).items():
+        if path in paths:
+            selected[path] = path_item
+            continue
+        operations = {
+            method: operation
+            for method, operation in path_item.items()
+            if method not in _PATH_ITEM_FIELDS
+            and isinstance(operation, dict)
+            and tags.intersection(operation.get("tags", ()))
+        }
+        if operations:
+            selected[path] = {
+                **{
+                    key: value
+                    for key, value in path_item.items()
+                    if key in _PATH_ITEM_FIELDS
+                },
+                **operations,
+            }
+    return selected
+
+
+def spec_fragment(spec, paths=None, tags=None):
+    """Return a standalone spec dict containing selected operations and the
+    transitive closure of components they reference.
+
+    Components are not copied: returned dict shares them with the spec.
+
+    :param APISpec|dict spec: APISpec object or its dict representation
+    :param paths: path templates to select, like "/pets/{pet_id}"
+    :param tags: operation tags to select
+    :return: spec dict
+    """
+    if not isinstance(spec, dict):
+        spec = spec.to_dict()
+
+    selected_paths = select_paths(spec, paths=paths, tags=tags)
+    # Top level dict may be APISpec.options itself, so never mutate it
+    fragment = {key: value for key, value in spec.items() if key != "paths"}
+    fragment["paths"] = selected_paths
+
+    _keep_referenced_components(spec, fragment, selected_paths)
+
+    if "tags" in spec:
+        used_tags = {
+            tag
+            for path_item in selected_paths.values()
+            for operation in path_item.values()
+            if isinstance(operation, dict)
+            for tag in operation.get("tags", ())
+        }
+        fragment["tags"] = [tag for tag in spec["tags"] if tag["name"] in used_tags]
+
+    return fragment
+
+
+def prune_components(spec, pinned=()):
+    """Return a spec dict without the components which are not reachable
+    from its paths.
+
+    Components are not copied: returned dict shares them with the spec.
+
+    :param APISpec|dict spec: APISpec object or its dict representation
+    :param pinned: names of components to keep even if no path reference them
+        (components they reference are kept too)
+    :return: spec dict
+    """
+    if not isinstance(spec, dict):
+        spec = spec.to_dict()
+
+    # Top level dict may be APISpec.options itself, so never mutate it
+    pruned = dict(spec)
+    pinned_paths = {
+        section_path + (name,)
+        for section_path in _component_sections(spec)
+        for name in pinned
+        if name in _get(spec, section_path)
+    }
+    _keep_referenced_components(spec, pruned, spec.get("paths", {}), pinned_paths)
+    return pruned
+
+
+def _keep_referenced_components(spec_dict, fragment, roots, pinned_paths=()):
+    """Replace component sections of fragment by the referenced components
+
+    :param dict spec_dict: spec dict containing all components
+    :param dict fragment: shallow copy of spec dict to update
+    :param roots: data where to search for references
+    :param pinned_paths: paths of components to keep anyway
+    """
+    pinned_paths = set(pinned_paths)
+    pinned_components = [get_ref_target(spec_dict, path) for path in pinned_paths]
+    referenced = ref_closure(spec_dict, [roots, pinned_components]) | pinned_paths
+    for section_path in _component_sections(spec_dict):
+        section = {
+            name: component
+            for name, component in _get(spec_dict, section_path).items()
+            if section_path + (name,) in referenced
+        }
+        _set(fragment, section_path, section)
+    if fragment.get("components") == {}:
+        del fragment["components"]
+
+
+def _component_sections(spec_dict):
+    if "components" in spec_dict:
+        return [
+            ("components", section)
+            for section in spec_dict["components"]
+            if section not in _SECURITY_SECTIONS
+        ]
+    return [
+        (section,)
+        for section in ("definitions", "parameters", "responses")
+        if section in spec_dict
+    ]
+
+
+def _get(data, path):
+    for key in path:
+        data = data[key]
+    return data
+
+
+def _set(data, path, value):
+    """Set value at path, copying traversed dicts. Empty value is removed."""
+    for key in path[:-1]:
+        data[key] = dict(data[key])
+        data = data[key]
+    if value:
+        data[path[-1]] = value
+    else:
+        data.pop(path[-1], None)
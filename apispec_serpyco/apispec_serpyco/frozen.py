@@ -0,0 +1,97 @@
+# coding: utf-8
+"""Immutable snapshot of a built spec.
+
+A frozen spec is made of read-only mappings and tuples, with its serialized
+bytes and content hash computed once, so it can be shared between threads and
+consumers without (defensive) copies.
+"""
+import hashlib
+import json
+import types
+
+from apispec_serpyco.shared import dump_spec
+
+
+def freeze_data(data):
+    """Return a read-only copy of json-like data: dicts become mapping proxies
+    and lists become tuples"""
+    if isinstance(data, dict):
+        return types.MappingProxyType(
+            {key: freeze_data(value) for key, value in data.items()}
+        )
+    if isinstance(data, (list, tuple)):
+        return tuple(freeze_data(item) for item in data)
+    return data
+
+
+def thaw_data(data):
+    """Return a mutable copy of data frozen with `freeze_data`"""
+    if isinstance(data, types.MappingProxyType):
+        return {key: thaw_data(value) for key, value in data.items()}
+    if isinstance(data, tuple):
+        return [thaw_data(item) for item in data]
+    return data
+
+
+class FrozenSpec(object):
+    """Read-only, hashable snapshot of a spec (see `freeze`)
+
+    :param bytes serialized: canonical json bytes of the spec (see
+        `apispec_serpyco.shared.dump_spec`)
+    """
+
+    __slots__ = ("_data", "_bytes", "_digest")
+
+    def __init__(self, serialized):
+        object.__setattr__(self, "_bytes", serialized)
+        object.__setattr__(
+            self, "_data", freeze_data(json.loads(serialized.decode("utf-8")))
+        )
+        object.__setattr__(self, "_digest", hashlib.sha256(serialized).hexdigest())
+
+    @property
+    def data(self):
+        """Spec as nested read-only mappings and tuples"""
+        return self._data
+
+    @property
+    def digest(self):
+        """sha256 hex digest of serialized spec"""
+        return self._digest
+
+    def to_bytes(self):
+        """Return canonical json bytes of the spec (computed once)"""
+        return self._bytes
+
+    def to_dict(self):
+        """Return a mutable copy of the spec dict"""
+        return thaw_data(self._data)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __hash__(self):
+        return hash(self._digest)
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenSpec):
+            return NotImplemented
+        return self._digest == other._digest and self._bytes == other._bytes
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenSpec is read-only")
+
+    def __repr__(self):
+        return "<FrozenSpec {}>".format(self._digest[:12])
+
+
+def freeze(spec):
+    """Return a read-only snapshot of a built spec
+
+    Data is taken from the serialized spec, so the snapshot shares nothing with
+    the spec and later spec changes are not reflected in it.
+
+    :param APISpec|dict spec: APISpec object or its dict representation
+    :return: FrozenSpec
+    """
+    return FrozenSpec(dump_spec(spec))
@@ -0,0 +1,225 @@
+# coding: utf-8
+"""Build json schema of generic dataclass specializations (like `Page[User]`)
+from one template per generic dataclass instead of converting each
+specialization from scratch.
+
+The template is the json schema of the generic dataclass specialized with
+placeholder dataclasses. A specialization is obtained by replacing references
+to placeholders by the real type arguments schemas.
+"""
+import copy
+
+from serpyco import SchemaBuilder
+from serpyco.field import _metadata_name
+from serpyco.util import JSON_ENCODABLE_TYPES
+import typing_inspect
+
+from apispec_serpyco.hints import get_type_hints
+import dataclasses
+
+# Field hints changing the schema of a field depending on its real type
+_TYPE_DEPENDENT_HINTS = (
+    "only",
+    "exclude",
+    "type_encoders",
+    "allowed_values",
+    "format_",
+    "pattern",
+    "min_length",
+    "max_length",
+    "minimum",
+    "maximum",
+)
+
+_placeholders = []
+
+
+def get_placeholders(count):
+    """Return `count` placeholder dataclasses (always the same ones)"""
+    while len(_placeholders) < count:
+        name = "ApispecSerpycoPlaceholder{}".format(len(_placeholders))
+        placeholder = dataclasses.make_dataclass(name, [])
+        placeholder.__module__ = __name__
+        _placeholders.append(placeholder)
+    return tuple(_placeholders[:count])
+
+
+def get_excluded_field_names(dataclass_):
+    return tuple(
+        field.name
+        for field in dataclasses.fields(dataclass_)
+        if getattr(field.metadata.get(_metadata_name), "ignore", False)
+    )
+
+
+def _uses_parameters(type_, parameters):
+    if type_ in parameters:
+        return True
+    return any(
+        _uses_parameters(arg, parameters)
+        for arg in typing_inspect.get_args(type_, evaluate=True)
+    )
+
+
+def get_template_arguments(alias, builder_args):
+    """Return (origin, type arguments) of a generic dataclass specialization if
+    its schema can be built from a template, None otherwise.
+
+    :param alias: generic dataclass specialization, like `Page[User]`
+    :param dict builder_args: serpyco.SchemaBuilder arguments
+    """
+    if builder_args.get("type_encoders"):
+        return None
+    origin = typing_inspect.get_origin(alias)
+    if origin is None or not dataclasses.is_dataclass(origin):
+        return None
+    arguments = typing_inspect.get_args(alias, evaluate=True)
+    parameters = typing_inspect.get_parameters(origin)
+    if not arguments or len(arguments) != len(parameters):
+        return None
+
+    for argument in arguments:
+        if argument in SchemaBuilder._global_types:
+            return None
+        if argument in JSON_ENCODABLE_TYPES:
+            continue
+        if not isinstance(argument, type) or not dataclasses.is_dataclass(argument):
+            return None
+        if typing_inspect.get_parameters(argument):
+            return None
+
+    type_hints = get_type_hints(origin)
+    for field in dataclasses.fields(origin):
+        hints = field.metadata.get(_metadata_name)
+        if hints is None or not _uses_parameters(type_hints[field.name], parameters):
+            continue
+        if any(getattr(hints, hint) for hint in _TYPE_DEPENDENT_HINTS):
+            return None
+
+    return origin, arguments
+
+
+def _replace_refs(data, replacements):
+    """Replace {"$ref": ...} dicts according to replacements (ref -> callable
+    returning new dict from the old one)"""
+    if isinstance(data, dict):
+        replace = replacements.get(data.get("$ref"))
+        if replace is not None:
+            return replace(data)
+        return {key: _replace_refs(value, replacements) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_replace_refs(item, replacements) for item in data]
+    return data
+
+
+def _iter_refs(data):
+    """Yield all "$ref" values of a json schema"""
+    if isinstance(data, dict):
+        ref = data.get("$ref")
+        if isinstance(ref, str):
+            yield ref
+        for value in data.values():
+            yield from _iter_refs(value)
+    elif isinstance(data, list):
+        for item in data:
+            yield from _iter_refs(item)
+
+
+def _mentions_placeholders(name, placeholders):
+    return any(placeholder.__name__ in name for placeholder in placeholders)
+
+
+def _replace_ref_with(ref):
+    return lambda data: {**copy.deepcopy(data), "$ref": ref}
+
+
+def _replace_ref_with_schema(schema):
+    return lambda data: {
+        **copy.deepcopy(schema),
+        **{key: copy.deepcopy(value) for key, value in data.items() if key != "$ref"},
+    }
+
+
+def specialize_template(
+    template, origin, arguments, get_definition_name, get_json_schema
+):
+    """Return json schema of `origin[arguments]` from the template schema
+
+    :param dict template: json schema of origin specialized with placeholders
+        (see `get_placeholders`)
+    :param type origin: generic dataclass
+    :param tuple arguments: type arguments
+    :param get_definition_name: nested definitions name resolver
+    :param get_json_schema: callable returning the standalone json schema of a
+        dataclass (must not be mutated)
+    :return: json schema, or None if template can't be used for these arguments
+    """
+    placeholders = get_placeholders(len(arguments))
+    placeholder_names = {
+        get_definition_name(placeholder, (), ()) for placeholder in placeholders
+    }
+    placeholder_refs = {"#/definitions/{}".format(name) for name in placeholder_names}
+    for ref in _iter_refs(template):
+        if ref not in placeholder_refs and _mentions_placeholders(ref, placeholders):
+            # A nested generic dataclass is specialized with a placeholder
+            return None
+    definitions = dict(template.get("definitions", {}))
+    for name in list(definitions):
+        if name in placeholder_names:
+            del definitions[name]
+        elif _mentions_placeholders(name, placeholders):
+            return None
+
+    own_name = get_definition_name(origin, arguments, ())
+    replacements = {}
+    for placeholder, argument in zip(placeholders, arguments):
+        placeholder_ref = "#/definitions/{}".format(
+            get_definition_name(placeholder, (), ())
+        )
+        if argument in JSON_ENCODABLE_TYPES:
+            replacements[placeholder_ref] = _replace_ref_with_schema(
+                JSON_ENCODABLE_TYPES[argument]
+            )
+            continue
+
+        argument_name = get_definition_name(
+            argument, (), get_excluded_field_names(argument)
+        )
+        argument_ref = "#/definitions/{}".format(argument_name)
+        replacements[placeholder_ref] = _replace_ref_with(argument_ref)
+
+        argument_schema = get_json_schema(argument)
+        argument_definitions = argument_schema.get("definitions", {})
+        if own_name in argument_definitions:
+            # Argument references the specialization itself
+            return None
+        # Argument is a nested definition here: its self references become
+        # absolute ones
+        auto_refs = {
+            "#": _replace_ref_with(argument_ref),
+            "#/items": _replace_ref_with(argument_ref),
+        }
+        for name, definition in argument_definitions.items():
+            if definition is not None:
+                definitions[name] = _replace_refs(definition, auto_refs)
+        definitions[argument_name] = _replace_refs(
+            {
+                key: value
+                for key, value in argument_schema.items()
+                if key not in ("definitions", "$schema")
+            },
+            auto_refs,
+        )
+
+    json_schema = _replace_refs(
+        {
+            key: value
+            for key, value in template.items()
+            if key not in ("definitions", "$schema")
+        },
+        replacements,
+    )
+    json_schema["definitions"] = _replace_refs(definitions, replacements)
+    if "$schema" in template:
+        json_schema["$schema"] = template["$schema"]
+    return json_schema
@@ -0,0 +1,79 @@
+# coding: utf-8
+"""Per process cache of resolved type hints of classes (dataclasses).
+
+Resolving type hints evaluates string forward references (like
+`typing.List["RunSchema"]`) with module globals lookups: it is done once per
+class, and shared by plugin, converter and registry helpers. A cached entry is
+dropped when the class, or a dataclass its hints reference, has been redefined
+(eg. module reload).
+"""
+import sys
+import types
+import typing
+import weakref
+
+import typing_inspect
+
+import dataclasses
+
+# (read-only hints, referenced dataclasses) of each class
+_type_hints = weakref.WeakKeyDictionary()
+
+
+def is_current_class(class_):
+    """Return False if class has been redefined since given class object was
+    created, ie. its module attribute is now another class
+
+    :param type class_: class to check (local classes are always current)
+    """
+    target = sys.modules.get(class_.__module__)
+    for name in class_.__qualname__.split("."):
+        target = getattr(target, name, None)
+        if target is None:
+            return True
+    return target is class_
+
+
+def _collect_dataclasses(hint, classes):
+    if isinstance(hint, type):
+        if dataclasses.is_dataclass(hint):
+            classes.add(hint)
+        return
+    origin = typing_inspect.get_origin(hint)
+    if origin is not None and dataclasses.is_dataclass(origin):
+        classes.add(origin)
+    for argument in typing_inspect.get_args(hint, evaluate=True):
+        _collect_dataclasses(argument, classes)
+
+
+def get_type_hints(class_):
+    """Return resolved type hints of a class, like `typing.get_type_hints`,
+    cached per class
+
+    :param type class_: class (usually a dataclass)
+    :return: read-only mapping of type hints, keyed by attribute name
+    :raise NameError: if a forward reference can't be resolved
+    """
+    try:
+        hints, classes = _type_hints[class_]
+    except (KeyError, TypeError):  # TypeError: not weak referenceable
+        pass
+    else:
+        if all(is_current_class(referenced) for referenced in classes):
+            return hints
+
+    hints = types.MappingProxyType(typing.get_type_hints(class_))
+    classes = set()
+    for hint in hints.values():
+        _collect_dataclasses(hint, classes)
+    classes.discard(class_)
+    try:
+        _type_hints[class_] = (hints, tuple(classes))
+    except TypeError:
+        pass
+    return hints
+
+
+def clear():
+    """Forget all cached type hints"""
+    _type_hints.clear()
@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
-import typing
-
 from apispec.utils import OpenAPIVersion
-import serpyco
 from serpyco.schema import default_get_definition_name
+import typing_inspect
 
+from apispec_serpyco.hints import get_type_hints
+from apispec_serpyco.registry import SchemaBuilderRegistry
+from apispec_serpyco.utils import copy_json
 import dataclasses
 
 __location_map__ = {
@@ -18,20 +19,76 @@ __location_map__ = {
 }
 
 
+def is_multiple_type(type_):
+    """Return True if type is a (optional) list, tuple or set type: a
+    parameter of this type can be repeated"""
+    if typing_inspect.is_optional_type(type_):
+        arguments = [
+            argument
+            for argument in typing_inspect.get_args(type_, evaluate=True)
+            if argument is not type(None)
+        ]
+        if len(arguments) == 1:
+            type_ = arguments[0]
+    origin = typing_inspect.get_origin(type_) or type_
+    return isinstance(origin, type) and issubclass(
+        origin, (list, tuple, set, frozenset)
+    )
+
+
 class OpenAPIConverter(object):
     """Converter generating OpenAPI specification from serpyco schemas and fields
 
     :param str|OpenAPIVersion openapi_version: The OpenAPI version to use.
         Should be in the form '2.x' or '3.x.x' to comply with the OpenAPI standard.
+    :param schema_name_resolver: nested definitions name resolver
+    :param SchemaBuilderRegistry builder_registry: cache of serpyco builders,
+        default is a registry of this converter
     """
 
     def __init__(
-        self, openapi_version, schema_name_resolver=default_get_definition_name
+        self,
+        openapi_version,
+        schema_name_resolver=default_get_definition_name,
+        builder_registry=None,
     ):
         self.openapi_version = OpenAPIVersion(openapi_version)
         # Schema references
         self.refs = {}
         self._schema_name_resolver = schema_name_resolver
+        if builder_registry is None:
+            builder_registry = SchemaBuilderRegistry()
+        self._builder_registry = builder_registry
+        # Resolved schemas and parameters, when paths are registered in batch
+        self._batch_cache = None
+
+    def start_batch(self):
+        """Cache resolved schemas and parameters until `end_batch` call"""
+        self._batch_cache = {}
+
+    def end_batch(self):
+        """Stop caching resolved schemas and parameters"""
+        self._batch_cache = None
+
+    def clear_batch_cache(self):
+        """Forget resolved schemas and parameters (eg. when refs change)"""
+        if self._batch_cache:
+            self._batch_cache.clear()
+
+    def _get_cached(self, key, build):
+        """Return build() result, cached if a batch is running"""
+        cache = self._batch_cache
+        if cache is None:
+            return build()
+        try:
+            return copy_json(cache[key])
+        except KeyError:
+            pass
+        except TypeError:  # Unhashable key
+            return build()
+        result = build()
+        cache[key] = copy_json(result)
+        return result
 
     def get_ref_path(self):
         """Return the path for references based on the openapi version"""
@@ -57,19 +114,17 @@ class OpenAPIConverter(object):
             ref_schema = {"$ref": "#/{0}/{1}".format(ref_path, self.refs[schema])}
             return ref_schema
 
-        return self.schema2jsonschema(schema)
+        return self._get_cached(
+            ("schema", schema), lambda: self.schema2jsonschema(schema)
+        )
 
     def fields2jsonschema(self, fields, schema=None):
         """Convert dataclass field into json_schema"""
         field_names = [field.name for field in fields]
-        serializer = serpyco.SchemaBuilder(
-            dataclass=schema,
-            only=field_names,
-            get_definition_name=self._schema_name_resolver,
+        return self._builder_registry.json_schema(
+            schema, only=field_names, get_definition_name=self._schema_name_resolver
         )
 
-        return serializer.json_schema()
-
     def schema2parameters(self, schema, **kwargs):
         """Return an array of OpenAPI parameters given a given dataclass.
         If `default_in` is "body", then return an array
@@ -78,7 +133,12 @@ class OpenAPIConverter(object):
 
         https://github.com/OAI/OpenAPI-Specification/blob/master/versions/2.0.md#parameterObject
         """
-        return self.fields2parameters(dataclasses.fields(schema), schema, **kwargs)
+        return self._get_cached(
+            ("parameters", schema, tuple(sorted(kwargs.items()))),
+            lambda: self.fields2parameters(
+                dataclasses.fields(schema), schema, **kwargs
+            ),
+        )
 
     def fields2parameters(
         self,
@@ -141,16 +201,19 @@ class OpenAPIConverter(object):
         """
         assert schema
 
-        serializer = serpyco.SchemaBuilder(
-            schema, only=[field.name], get_definition_name=self._schema_name_resolver
+        # Use whole dataclass schema (shared by all its fields) rather than
+        # building one schema per field
+        field_json_schema = self._builder_registry.field_json_schema(
+            schema, field.name, get_definition_name=self._schema_name_resolver
         )
-        field_json_schema = serializer.json_schema()["properties"][field.name]
 
         return self.property2parameter(
             field_json_schema,
             name=name,
             required=isinstance(field.default, dataclasses._MISSING_TYPE),
-            multiple=isinstance(field.type, typing.Sequence),
+            # field.type is a string with forward references or postponed
+            # annotations: use resolved (and cached) type hints
+            multiple=is_multiple_type(get_type_hints(schema)[field.name]),
             default_in=default_in,
         )
 
@@ -0,0 +1,194 @@
+# coding: utf-8
+"""Index of spec operations, filled while paths are registered (see
+`SerpycoPlugin.operations`), to look operations up without scanning the spec.
+"""
+import collections
+import re
+
+from apispec.exceptions import APISpecError
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+IndexedOperation = collections.namedtuple(
+    "IndexedOperation", ("method", "path", "operation")
+)
+OperationMatch = collections.namedtuple(
+    "OperationMatch", ("method", "path", "operation", "path_params")
+)
+
+_PATH_PARAM = re.compile(r"{([^/{}]+)}")
+
+
+def _get_template_priority(path):
+    """Sort key of path templates: concrete segments before templated ones"""
+    return tuple(1 if _PATH_PARAM.search(part) else 0 for part in path.split("/"))
+
+
+class OperationIndex(object):
+    """Operations indexed by (method, path template), operationId and tag, with
+    a path template matcher
+
+    Indexed operations are the operation dicts of the spec (not copies).
+    """
+
+    def __init__(self):
+        self._operations = {}
+        self._by_id = {}
+        self._by_tag = {}
+        self._static_paths = set()
+        # Templated paths, in registration order
+        self._templated_paths = {}
+        # Compiled templated paths matcher, built on first match
+        self._matcher = None
+
+    def __len__(self):
+        return len(self._operations)
+
+    def __iter__(self):
+        for (method, path), operation in self._operations.items():
+            yield IndexedOperation(method, path, operation)
+
+    def add(self, path, operations):
+        """Index operations of a path
+
+        :param str path: path template, like "/pets/{pet_id}"
+        :param dict operations: operation objects, keyed by HTTP method
+        :raise APISpecError: if an operationId is already used by another
+            operation
+        """
+        for method, operation in operations.items():
+            method = method.lower()
+            if method not in HTTP_METHODS or not isinstance(operation, dict):
+                continue
+            key = (method, path)
+            operation_id = operation.get("operationId")
+            if operation_id is not None and self._by_id.get(operation_id, key) != key:
+                raise APISpecError(
+                    'Another operation has operationId "{}"'.format(operation_id)
+                )
+            self._remove(key)
+
+            self._operations[key] = operation
+            if operation_id is not None:
+                self._by_id[operation_id] = key
+            for tag in operation.get("tags", ()):
+                self._by_tag.setdefault(tag, []).append(key)
+
+        if _PATH_PARAM.search(path) is None:
+            self._static_paths.add(path)
+        elif path not in self._templated_paths:
+            self._templated_paths[path] = None
+            self._matcher = None
+
+    def _remove(self, key):
+        operation = self._operations.pop(key, None)
+        if operation is None:
+            return
+        operation_id = operation.get("operationId")
+        if self._by_id.get(operation_id) == key:
+            del self._by_id[operation_id]
+        for tag in operation.get("tags", ()):
+            keys = self._by_tag.get(tag, [])
+            if key in keys:
+                keys.remove(key)
+
+    def get(self, method, path):
+        """Return the operation of a method and path template, None if any
+
+        :param str method: HTTP method
+        :param str path: path template, like "/pets/{pet_id}"
+        """
+        return self._operations.get((method.lower(), path))
+
+    def get_by_id(self, operation_id):
+        """Return the operation with given operationId, None if any
+
+        :return: IndexedOperation or None
+        """
+        key = self._by_id.get(operation_id)
+        if key is None:
+            return None
+        return IndexedOperation(key[0], key[1], self._operations[key])
+
+    def get_by_tag(self, tag):
+        """Return operations with given tag, in registration order
+
+        :return: list of IndexedOperation
+        """
+        return [
+            IndexedOperation(method, path, self._operations[(method, path)])
+            for method, path in self._by_tag.get(tag, ())
+        ]
+
+    def _compile_matcher(self):
+        # One regex for all templated paths, most concrete ones first. Path
+        # params group names are made unique by prefixing them with the
+        # template index. Each template regex is kept too, to try next
+        # matching templates when one has no operation for the method
+        alternatives = []
+        templates = []
+        groups = {}
+        paths = sorted(self._templated_paths, key=_get_template_priority)
+        for index, path in enumerate(paths):
+            group = "t{}".format(index)
+            params = {}
+            pattern = []
+            position = 0
+            for param_index, param in enumerate(_PATH_PARAM.finditer(path)):
+                param_group = "{}_{}".format(group, param_index)
+                params[param_group] = param.group(1)
+                pattern.append(re.escape(path[position : param.start()]))
+                pattern.append("(?P<{}>[^/]+)".format(param_group))
+                position = param.end()
+            pattern.append(re.escape(path[position:]))
+            pattern = "".join(pattern)
+            alternatives.append("(?P<{}>{})".format(group, pattern))
+            templates.append((path, params, re.compile(pattern + "$")))
+            groups[group] = index
+        regex = re.compile("(?:{})$".format("|".join(alternatives)))
+        return regex, groups, templates
+
+    def match(self, method, url_path):
+        """Return the operation matching a request method and url path
+
+        Concrete paths have priority over templated ones (eg. "/pets/mine"
+        over "/pets/{pet_id}"), among paths having an operation for the
+        method.
+
+        :param str method: HTTP method
+        :param str url_path: requested path, like "/pets/12"
+        :return: OperationMatch (with path params values) or None
+        """
+        method = method.lower()
+        if url_path in self._static_paths:
+            operation = self._operations.get((method, url_path))
+            if operation is not None:
+                return OperationMatch(method, url_path, operation, {})
+
+        if not self._templated_paths:
+            return None
+        if self._matcher is None:
+            self._matcher = self._compile_matcher()
+        regex, groups, templates = self._matcher
+        match = regex.match(url_path)
+        if match is None:
+            return None
+        index = groups[match.lastgroup]
+        while True:
+            path, params, _ = templates[index]
+            operation = self._operations.get((method, path))
+            if operation is not None:
+                return OperationMatch(
+                    method,
+                    path,
+                    operation,
+                    {param: match.group(group) for group, param in params.items()},
+                )
+
+            # Next matching template, in priority order
+            for index in range(index + 1, len(templates)):
+                match = templates[index][2].match(url_path)
+                if match is not None:
+                    break
+            else:
+                return None
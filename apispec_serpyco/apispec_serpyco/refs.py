@@ -0,0 +1,97 @@
+# coding: utf-8
+"""Helpers to walk "$ref" links of an OpenAPI spec dict.
+
+A reference target is represented by its path in spec dict, as a tuple of
+keys. Example: "#/components/schemas/Pet" is ("components", "schemas", "Pet").
+"""
+
+
+def get_schemas_path(spec_dict):
+    """Return the path of schema components in spec dict
+
+    :param dict spec_dict: spec dict, OpenAPI 2 or 3
+    :return: ("components", "schemas") or ("definitions",)
+    """
+    if "components" in spec_dict or spec_dict.get("openapi"):
+        return ("components", "schemas")
+    return ("definitions",)
+
+
+def iter_refs(data):
+    """Yield all "$ref" values found in given data
+
+    :param data: dict, list or scalar to inspect recursively
+    """
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            ref = item.get("$ref")
+            if isinstance(ref, str):
+                yield ref
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+
+
+def ref_to_path(ref):
+    """Return the path of a local reference in spec dict
+
+    :param str ref: "$ref" value, like "#/definitions/Pet"
+    :return: tuple of keys, or None if reference is not a local one
+    """
+    if not ref.startswith("#/"):
+        return None
+    return tuple(
+        part.replace("~1", "/").replace("~0", "~") for part in ref[2:].split("/")
+    )
+
+
+def path_to_ref(path, document=""):
+    """Return the reference to given path (reverse of `ref_to_path`)
+
+    :param tuple path: tuple of keys
+    :param str document: referenced document url, empty for a local reference
+    """
+    return "{}#/{}".format(
+        document,
+        "/".join(str(part).replace("~", "~0").replace("/", "~1") for part in path),
+    )
+
+
+def get_ref_target(spec_dict, path):
+    """Return the object located at given path of spec dict
+
+    :param dict spec_dict: spec dict
+    :param tuple path: path as returned by `ref_to_path`
+    :return: referenced object, or None if path does not exist
+    """
+    target = spec_dict
+    for key in path:
+        try:
+            target = target[key]
+        except (KeyError, TypeError):
+            return None
+    return target
+
+
+def ref_closure(spec_dict, data):
+    """Return paths of all objects transitively referenced from given data
+
+    :param dict spec_dict: spec dict containing referenced objects
+    :param data: dict or list (eg. operations) where to start from
+    :return: set of paths (see `ref_to_path`)
+    """
+    closure = set()
+    pending = [data]
+    while pending:
+        for ref in iter_refs(pending.pop()):
+            path = ref_to_path(ref)
+            if path is None or path in closure:
+                continue
+            target = get_ref_target(spec_dict, path)
+            if target is None:
+                continue
+            closure.add(path)
+            pending.append(target)
+    return closure
@@ -0,0 +1,355 @@
+# coding: utf-8
+import json
+import threading
+
+import serpyco
+from serpyco.schema import default_get_definition_name
+import typing_inspect
+
+from apispec_serpyco.generics import get_excluded_field_names
+from apispec_serpyco.generics import get_placeholders
+from apispec_serpyco.generics import get_template_arguments
+from apispec_serpyco.generics import specialize_template
+from apispec_serpyco.sources import get_source_fingerprint
+from apispec_serpyco.sources import is_fingerprint_current
+from apispec_serpyco.utils import copy_json
+import dataclasses
+
+# Builder arguments allowed in source cache keys
+_SOURCE_KEY_ARGS = ("get_definition_name", "strict")
+
+
+def _make_key(dataclass_, **kwargs):
+    """Return a hashable key for given dataclass and builder/serializer args"""
+    items = []
+    for name, value in sorted(kwargs.items()):
+        if isinstance(value, dict):
+            value = tuple(value.items())
+        elif isinstance(value, (list, set)):
+            value = tuple(value)
+        items.append((name, value))
+    return (dataclass_,) + tuple(items)
+
+
+def get_selected_field_names(dataclass_, only=None, exclude=None):
+    """Return names of dataclass fields selected by only/exclude parameters
+
+    :param type dataclass_: dataclass (or generic dataclass specialization)
+    :param only: field names to keep
+    :param exclude: field names to exclude
+    :return: frozenset of field names, or None if all fields are selected
+    """
+    if not only and not exclude:
+        return None
+    origin = typing_inspect.get_origin(dataclass_) or dataclass_
+    field_names = [field.name for field in dataclasses.fields(origin)]
+    selected = frozenset(
+        name
+        for name in field_names
+        if (not only or name in only) and (not exclude or name not in exclude)
+    )
+    if len(selected) == len(field_names):
+        return None
+    return selected
+
+
+class SchemaBuilderRegistry(object):
+    """Cache of serpyco schema builders and serializers, keyed by dataclass and
+    their construction arguments.
+
+    Give the same registry to `SerpycoPlugin` (and use it to get your runtime
+    serializers) so each dataclass is introspected once per process, whatever
+    the spec or the code path needing it.
+
+    Json schemas are cached, not the builders converting them (only the ones
+    asked with `get_builder`). Definitions of dataclasses nested in several
+    json schemas are shared by them.
+
+    Json schemas of generic dataclass specializations (like `Page[User]`) are
+    derived from one template per generic dataclass when possible (see
+    `apispec_serpyco.generics`). Json schemas restricted with only/exclude are
+    cached by selected field set, so different only/exclude spellings of the
+    same variant are converted once.
+
+    With `source_cache` enabled, json schemas are also cached by dataclass
+    module and name plus source fingerprint of the dataclass and the
+    dataclasses it references (see `apispec_serpyco.sources`). After a module
+    reload, only dataclasses whose sources changed are converted again. This
+    cache can be saved to a file and loaded by next process.
+
+    :param bool source_cache: enable source fingerprint cache
+    """
+
+    def __init__(self, source_cache=False):
+        self._builders = {}
+        self._json_schemas = {}
+        # Definition of each name, shared by json schemas nesting it
+        self._definitions = {}
+        self._generic_templates = {}
+        self._serializers = {}
+        self._source_cache = {} if source_cache else None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_builder_key(
+        dataclass_,
+        only=None,
+        exclude=None,
+        get_definition_name=default_get_definition_name,
+        **builder_args
+    ):
+        return _make_key(
+            dataclass_,
+            fields=get_selected_field_names(dataclass_, only, exclude),
+            get_definition_name=get_definition_name,
+            **builder_args
+        )
+
+    def get_builder(
+        self,
+        dataclass_,
+        only=None,
+        exclude=None,
+        get_definition_name=default_get_definition_name,
+        **builder_args
+    ):
+        """Return a (cached) serpyco.SchemaBuilder for given dataclass
+
+        :param type dataclass_: dataclass
+        :param only: field names to keep
+        :param exclude: field names to exclude
+        :param get_definition_name: nested definitions name resolver
+        :param builder_args: other serpyco.SchemaBuilder arguments
+        """
+        key = self._make_builder_key(
+            dataclass_,
+            only=only,
+            exclude=exclude,
+            get_definition_name=get_definition_name,
+            **builder_args
+        )
+        try:
+            return self._builders[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if key not in self._builders:
+                self._builders[key] = serpyco.SchemaBuilder(
+                    dataclass_,
+                    only=only,
+                    exclude=exclude,
+                    get_definition_name=get_definition_name,
+                    **builder_args
+                )
+            return self._builders[key]
+
+    def _build_json_schema(self, dataclass_, **kwargs):
+        """Convert a dataclass with serpyco
+
+        The builder is not cached (its json schema is). Definitions equal to
+        definitions of already built json schemas are replaced by them, so
+        dataclasses nested in several ones are kept once in memory.
+        """
+        json_schema = serpyco.SchemaBuilder(dataclass_, **kwargs).json_schema()
+        definitions = json_schema.get("definitions", {})
+        for name, definition in definitions.items():
+            shared = self._definitions.setdefault(name, definition)
+            if shared is not definition and shared == definition:
+                definitions[name] = shared
+
+        if isinstance(dataclass_, type) and not (
+            kwargs.get("only") or kwargs.get("exclude")
+        ):
+            # Json schema is the definition of the dataclass in other ones
+            get_definition_name = kwargs.get(
+                "get_definition_name", default_get_definition_name
+            )
+            name = get_definition_name(
+                dataclass_, (), get_excluded_field_names(dataclass_)
+            )
+            definition = {
+                key: value
+                for key, value in json_schema.items()
+                if key not in ("definitions", "$schema")
+            }
+            shared = self._definitions.setdefault(name, definition)
+            if shared is not definition and shared == definition:
+                json_schema.update(shared)
+        return json_schema
+
+    def _get_json_schema(self, dataclass_, only=None, exclude=None, **kwargs):
+        key = self._make_builder_key(dataclass_, only=only, exclude=exclude, **kwargs)
+        try:
+            return self._json_schemas[key]
+        except KeyError:
+            pass
+
+        if get_selected_field_names(dataclass_, only, exclude) is not None:
+            json_schema = self._build_json_schema(
+                dataclass_, only=only, exclude=exclude, **kwargs
+            )
+        else:
+            source_key = self._make_source_key(dataclass_, **kwargs)
+            json_schema = self._source_cache.get(source_key) if source_key else None
+            if json_schema is None:
+                json_schema = self._get_generic_json_schema(dataclass_, **kwargs)
+            if json_schema is None:
+                json_schema = self._build_json_schema(dataclass_, **kwargs)
+            if source_key:
+                json_schema = self._source_cache.setdefault(source_key, json_schema)
+        return self._json_schemas.setdefault(key, json_schema)
+
+    def _make_source_key(
+        self, dataclass_, get_definition_name=default_get_definition_name, **kwargs
+    ):
+        """Return source cache key (json string) of a dataclass json schema,
+        None if it can't be cached by source"""
+        if self._source_cache is None or not isinstance(dataclass_, type):
+            return None
+        if any(name not in _SOURCE_KEY_ARGS for name in kwargs):
+            return None
+        resolver_name = getattr(get_definition_name, "__qualname__", "<")
+        if "<" in resolver_name or "<" in dataclass_.__qualname__:
+            # Lambdas and locally defined objects can't be identified by name
+            return None
+        fingerprint = get_source_fingerprint(dataclass_)
+        if fingerprint is None:
+            return None
+        return json.dumps(
+            [
+                "{}:{}".format(dataclass_.__module__, dataclass_.__qualname__),
+                "{}:{}".format(get_definition_name.__module__, resolver_name),
+                kwargs.get("strict", False),
+                fingerprint,
+            ]
+        )
+
+    def save_source_cache(self, path):
+        """Save json schemas cached by source fingerprint into a json file
+
+        Entries whose sources changed since they were cached are dropped.
+
+        :param str path: file path
+        """
+        if self._source_cache is None:
+            raise ValueError("Source cache is not enabled on this registry")
+        with self._lock:
+            entries = [
+                [key, json_schema]
+                for key, json_schema in self._source_cache.items()
+                if is_fingerprint_current(json.loads(key)[-1])
+            ]
+        with open(path, "w") as file_:
+            json.dump(entries, file_)
+
+    def load_source_cache(self, path):
+        """Load json schemas cached by source fingerprint from a json file
+        written by `save_source_cache`
+
+        :param str path: file path
+        """
+        if self._source_cache is None:
+            raise ValueError("Source cache is not enabled on this registry")
+        with open(path) as file_:
+            entries = json.load(file_)
+        with self._lock:
+            for key, json_schema in entries:
+                self._source_cache.setdefault(key, json_schema)
+
+    def _get_generic_json_schema(
+        self, alias, get_definition_name=default_get_definition_name, **builder_args
+    ):
+        """Return json schema of generic dataclass specialization from its
+        template, or None if it can't be built this way"""
+        template_arguments = get_template_arguments(alias, builder_args)
+        if template_arguments is None:
+            return None
+        origin, arguments = template_arguments
+
+        kwargs = dict(get_definition_name=get_definition_name, **builder_args)
+        template_key = self._make_builder_key(origin, **kwargs) + (len(arguments),)
+        try:
+            template = self._generic_templates[template_key]
+        except KeyError:
+            placeholders = get_placeholders(len(arguments))
+            template = serpyco.SchemaBuilder(
+                origin[placeholders], **kwargs
+            ).json_schema()
+            template = self._generic_templates.setdefault(template_key, template)
+
+        return specialize_template(
+            template,
+            origin,
+            arguments,
+            get_definition_name,
+            lambda dataclass_: self._get_json_schema(
+                dataclass_, get_definition_name=get_definition_name
+            ),
+        )
+
+    def get_json_schema(self, dataclass_, **kwargs):
+        """Return the cached json schema of given dataclass, shared by all
+        callers: it must not be mutated (see `json_schema` for a copy)
+
+        :param type dataclass_: dataclass
+        :param kwargs: see `get_builder`
+        """
+        return self._get_json_schema(dataclass_, **kwargs)
+
+    def json_schema(self, dataclass_, **kwargs):
+        """Return a copy of the json schema of given dataclass
+
+        :param type dataclass_: dataclass
+        :param kwargs: see `get_builder`
+        """
+        return copy_json(self._get_json_schema(dataclass_, **kwargs))
+
+    def field_json_schema(self, dataclass_, field_name, **kwargs):
+        """Return a copy of the json schema property of one dataclass field
+
+        :param type dataclass_: dataclass
+        :param str field_name: property name
+        :param kwargs: see `get_builder`
+        """
+        json_schema = self._get_json_schema(dataclass_, **kwargs)
+        return copy_json(json_schema["properties"][field_name])
+
+    def get_serializer(self, dataclass_, **serializer_args):
+        """Return a (cached) serpyco.Serializer for given dataclass, to be used
+        at runtime to (de)serialize dataclass instances
+
+        :param type dataclass_: dataclass
+        :param serializer_args: serpyco.Serializer arguments
+        """
+        key = _make_key(dataclass_, **serializer_args)
+        try:
+            return self._serializers[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if key not in self._serializers:
+                self._serializers[key] = serpyco.Serializer(
+                    dataclass_, **serializer_args
+                )
+            return self._serializers[key]
+
+    def clear(self):
+        """Forget all cached builders, json schemas and serializers, and the
+        dataclasses they reference (eg. after a module reload, or when
+        dataclasses are created dynamically)"""
+        with self._lock:
+            self._builders.clear()
+            self._json_schemas.clear()
+            self._definitions.clear()
+            self._generic_templates.clear()
+            self._serializers.clear()
+            if self._source_cache is not None:
+                self._source_cache.clear()
+
+
+# Process wide registry, shared by plugins given it (see
+# `SerpycoPlugin(builder_registry=default_registry)`) and runtime serializers.
+# It keeps cached dataclasses alive until `default_registry.clear()`
+default_registry = SchemaBuilderRegistry()
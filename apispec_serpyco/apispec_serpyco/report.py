@@ -0,0 +1,198 @@
+# coding: utf-8
+"""Per component size and cost report of a built spec.
+
+Conversion times are read from `SerpycoPlugin` (or any spec plugin exposing
+a ``conversion_times`` attribute), other columns only depend on the spec dict.
+
+Command line usage (spec is an APISpec object, or a callable returning one)::
+
+    python -m apispec_serpyco.report myapp.doc:spec --format table --sort size
+"""
+import argparse
+import collections
+import importlib
+import json
+import sys
+
+from apispec_serpyco.refs import get_ref_target
+from apispec_serpyco.refs import get_schemas_path
+from apispec_serpyco.refs import iter_refs
+from apispec_serpyco.refs import ref_to_path
+
+ComponentReport = collections.namedtuple(
+    "ComponentReport", ("name", "size", "inbound_refs", "conversion_time", "depth")
+)
+ComponentReport.__doc__ = """Report of one schema component
+
+:param str name: component name
+:param int size: serialized (compact json) byte size
+:param int inbound_refs: count of references to this component in the spec
+:param float conversion_time: conversion time in seconds (including nested
+    components), None if unknown (eg. component converted as a nested one)
+:param int depth: length of the longest chain of components referenced from
+    this one (0 if it references no other component)
+"""
+
+SORT_KEYS = ("name", "size", "inbound_refs", "conversion_time", "depth")
+
+
+def _get_conversion_times(spec):
+    conversion_times = {}
+    for plugin in getattr(spec, "plugins", ()):
+        conversion_times.update(getattr(plugin, "conversion_times", {}))
+    return conversion_times
+
+
+def build_report(spec, conversion_times=None):
+    """Return the report of each schema component of a spec
+
+    :param APISpec|dict spec: APISpec object or its dict representation
+    :param dict conversion_times: conversion times keyed by component name,
+        default is to collect them from spec plugins
+    :return: list of ComponentReport, ordered as components in spec
+    """
+    if conversion_times is None:
+        conversion_times = _get_conversion_times(spec)
+    spec_dict = spec if isinstance(spec, dict) else spec.to_dict()
+
+    schemas_path = get_schemas_path(spec_dict)
+    schemas = get_ref_target(spec_dict, schemas_path) or {}
+
+    def get_referenced_names(data):
+        for ref in iter_refs(data):
+            path = ref_to_path(ref)
+            if path and path[:-1] == schemas_path and path[-1] in schemas:
+                yield path[-1]
+
+    inbound_refs = collections.Counter(get_referenced_names(spec_dict))
+    children = {
+        name: set(get_referenced_names(schema)) - {name}
+        for name, schema in schemas.items()
+    }
+
+    depths = {}
+
+    def get_depth(name, visiting):
+        if name not in depths:
+            visiting.add(name)
+            depths[name] = max(
+                [
+                    get_depth(child, visiting) + 1
+                    for child in children[name]
+                    if child not in visiting
+                ]
+                or [0]
+            )
+            visiting.discard(name)
+        return depths[name]
+
+    return [
+        ComponentReport(
+            name=name,
+            size=len(
+                json.dumps(schema, sort_keys=True, separators=(",", ":")).encode(
+                    "utf-8"
+                )
+            ),
+            inbound_refs=inbound_refs[name],
+            conversion_time=conversion_times.get(name),
+            depth=get_depth(name, set()),
+        )
+        for name, schema in schemas.items()
+    ]
+
+
+def sort_report(reports, key="size"):
+    """Sort reports, biggest values first (except for "name" key)
+
+    :param reports: list of ComponentReport
+    :param str key: one of SORT_KEYS
+    """
+    if key == "name":
+        return sorted(reports, key=lambda report: report.name)
+    return sorted(
+        reports,
+        key=lambda report: (
+            getattr(report, key) is not None,
+            getattr(report, key) or 0,
+        ),
+        reverse=True,
+    )
+
+
+def report_to_json(reports):
+    """Return reports as a json string"""
+    return json.dumps([report._asdict() for report in reports], indent=2)
+
+
+def report_to_table(reports):
+    """Return reports as a plain text table"""
+    header = ("name", "size", "refs", "time (ms)", "depth")
+    rows = [
+        (
+            report.name,
+            str(report.size),
+            str(report.inbound_refs),
+            (
+                "-"
+                if report.conversion_time is None
+                else "{:.3f}".format(report.conversion_time * 1000)
+            ),
+            str(report.depth),
+        )
+        for report in reports
+    ]
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = []
+    for row in [header] + rows:
+        lines.append(
+            "  ".join(
+                [row[0].ljust(widths[0])]
+                + [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+            )
+        )
+    return "\n".join(lines)
+
+
+def load_spec(target):
+    """Import spec from "module:attribute" target
+
+    Attribute can be an APISpec object or a callable returning one.
+    """
+    module_name, _, attribute = target.partition(":")
+    if not attribute:
+        raise ValueError('Spec target must be like "module:attribute"')
+    spec = importlib.import_module(module_name)
+    for name in attribute.split("."):
+        spec = getattr(spec, name)
+    if callable(spec) and not hasattr(spec, "to_dict"):
+        spec = spec()
+    return spec
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m apispec_serpyco.report",
+        description="Report size and cost of each schema component of a spec",
+    )
+    parser.add_argument("spec", help='spec to import, like "myapp.doc:spec"')
+    parser.add_argument("--format", choices=("table", "json"), default="table")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="size")
+    parser.add_argument("--output", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    reports = sort_report(build_report(load_spec(args.spec)), key=args.sort)
+    if args.format == "json":
+        output = report_to_json(reports)
+    else:
+        output = report_to_table(reports)
+
+    if args.output:
+        with open(args.output, "w") as file_:
+            file_.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
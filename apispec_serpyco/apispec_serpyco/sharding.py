@@ -0,0 +1,164 @@
+# coding: utf-8
+"""Split a built spec into several documents: the main one (paths, other
+components, etc.) and schema components shards, referenced with external
+"$ref" (like "components/myapp.models.json#/Pet").
+
+Consumers (doc UIs, code generators) can then fetch and cache only the shards
+they need.
+"""
+import os
+import re
+
+from apispec_serpyco.encoding import dumps_canonical
+from apispec_serpyco.refs import get_ref_target
+from apispec_serpyco.refs import get_schemas_path
+from apispec_serpyco.refs import path_to_ref
+from apispec_serpyco.refs import ref_to_path
+
+DEFAULT_SHARD = "default"
+
+
+def _get_component_modules(spec):
+    """Return module of registered dataclasses, keyed by component name"""
+    modules = {}
+    for plugin in getattr(spec, "plugins", ()):
+        refs = getattr(getattr(plugin, "openapi", None), "refs", {})
+        for dataclass_, name in refs.items():
+            dataclass_ = getattr(dataclass_, "__origin__", None) or dataclass_
+            modules[name] = getattr(dataclass_, "__module__", DEFAULT_SHARD)
+    return modules
+
+
+def shard_by_module(spec):
+    """Return a shard resolver grouping components by dataclass module
+
+    Module of registered dataclasses is known from spec plugins. Other
+    components (eg. nested dataclasses) are grouped by their name prefix before
+    last dot (serpyco default names are like "myapp.models.Pet").
+
+    :param APISpec spec: APISpec object
+    """
+    modules = _get_component_modules(spec)
+
+    def get_shard(name):
+        if name in modules:
+            return modules[name]
+        if "." in name:
+            return name.rsplit(".", 1)[0]
+        return DEFAULT_SHARD
+
+    return get_shard
+
+
+def shard_by_prefix(separator="_"):
+    """Return a shard resolver grouping components by their name prefix
+
+    :param str separator: prefix separator, eg. "Pet_Create" prefix is "Pet"
+    """
+
+    def get_shard(name):
+        if separator in name:
+            return name.split(separator, 1)[0]
+        return DEFAULT_SHARD
+
+    return get_shard
+
+
+def _get_shard_file(shard, directory):
+    return "{}/{}.json".format(directory, re.sub(r"[^\w.-]", "_", shard))
+
+
+def _rewrite_refs(data, rewrite):
+    """Return a copy of data with "$ref" values replaced by rewrite(ref)"""
+    if isinstance(data, dict):
+        copied = {key: _rewrite_refs(value, rewrite) for key, value in data.items()}
+        if isinstance(copied.get("$ref"), str):
+            copied["$ref"] = rewrite(copied["$ref"])
+        return copied
+    if isinstance(data, (list, tuple)):
+        return [_rewrite_refs(item, rewrite) for item in data]
+    return data
+
+
+def shard_spec(spec, shard_by="module", directory="components"):
+    """Split a spec into a main document and schema components shards
+
+    Each shard document maps component names to schemas. References to
+    schema components are rewritten to external references, relative to the
+    referencing document.
+
+    :param APISpec|dict spec: APISpec object or its dict representation
+    :param shard_by: "module" (see `shard_by_module`, requires an APISpec
+        object), "prefix" (see `shard_by_prefix`) or a callable returning the
+        shard name of a component name
+    :param str directory: shards directory, relative to main document
+    :return: dict of documents, keyed by file path relative to main document
+        (main document key is "")
+    """
+    if shard_by == "module":
+        shard_by = shard_by_module(spec)
+    elif shard_by == "prefix":
+        shard_by = shard_by_prefix()
+    spec_dict = spec if isinstance(spec, dict) else spec.to_dict()
+
+    schemas_path = get_schemas_path(spec_dict)
+    schemas = get_ref_target(spec_dict, schemas_path) or {}
+    shard_files = {name: _get_shard_file(shard_by(name), directory) for name in schemas}
+
+    def make_rewrite(from_file):
+        def rewrite(ref):
+            path = ref_to_path(ref)
+            if path is None or path[:-1] != schemas_path:
+                return ref
+            to_file = shard_files.get(path[-1])
+            if to_file is None:
+                return ref
+            if from_file == to_file:
+                document = ""
+            elif from_file:
+                # Shards are in the same directory
+                document = os.path.basename(to_file)
+            else:
+                document = to_file
+            return path_to_ref(path[-1:], document)
+
+        return rewrite
+
+    documents = {}
+    for name, schema in schemas.items():
+        shard_file = shard_files[name]
+        documents.setdefault(shard_file, {})[name] = _rewrite_refs(
+            schema, make_rewrite(shard_file)
+        )
+
+    main_document = _rewrite_refs(spec_dict, make_rewrite(""))
+    parent = main_document
+    for key in schemas_path[:-1]:
+        parent = parent[key]
+    parent.pop(schemas_path[-1], None)
+    if schemas_path[:-1] and not parent:
+        del main_document[schemas_path[0]]
+    documents[""] = main_document
+    return documents
+
+
+def write_shards(spec, path, **kwargs):
+    """Write a sharded spec (see `shard_spec`) as json files
+
+    :param APISpec|dict spec: APISpec object or its dict representation
+    :param str path: main document file path, shards are written relatively
+        to its directory
+    :param kwargs: see `shard_spec`
+    :return: list of written file paths
+    """
+    base_directory = os.path.dirname(path)
+    written = []
+    for relative_path, document in shard_spec(spec, **kwargs).items():
+        file_path = (
+            os.path.join(base_directory, relative_path) if relative_path else path
+        )
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        with open(file_path, "wb") as file_:
+            file_.write(dumps_canonical(document))
+        written.append(file_path)
+    return written
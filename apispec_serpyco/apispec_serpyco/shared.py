@@ -0,0 +1,178 @@
+# coding: utf-8
+"""Share one built spec between processes.
+
+Typical use is a pre-fork server (eg. gunicorn): the master process builds the
+spec once and publishes its serialized bytes into a memory-mapped file or a
+shared memory block, then each worker attaches to it read-only instead of
+regenerating the spec.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+from apispec_serpyco.encoding import dumps_canonical
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # python < 3.8
+    shared_memory = None
+
+# Shared memory blocks may be rounded up to page size, so the real payload
+# length is stored in a fixed size header.
+_SHM_HEADER = struct.Struct("<Q")
+
+
+def dump_spec(spec):
+    """Serialize a spec into canonical json bytes (see
+    `apispec_serpyco.encoding`)
+
+    :param APISpec|dict spec: APISpec object or its dict representation
+    :return: utf-8 encoded json bytes
+    """
+    if not isinstance(spec, dict):
+        spec = spec.to_dict()
+    return dumps_canonical(spec)
+
+
+class SharedSpec(object):
+    """Read-only view on a spec serialized in shared memory or a mapped file.
+
+    Use one of the ``publish_*`` class methods in the process building the
+    spec and the matching ``attach_*`` class method in other processes.
+
+    :param memoryview buffer: read-only buffer containing serialized spec
+    :param close_callback: callable releasing underlying resources
+    :param str name: shared memory block name, if any
+    """
+
+    def __init__(self, buffer, close_callback=None, name=None):
+        self._buffer = buffer
+        self._close_callback = close_callback
+        self._block = None
+        self._dict = None
+        self.name = name
+
+    @property
+    def buffer(self):
+        """Read-only memoryview of serialized spec (no copy)"""
+        return self._buffer
+
+    def to_bytes(self):
+        """Return a private copy of serialized spec"""
+        return self._buffer.tobytes()
+
+    def to_dict(self):
+        """Return the spec as dict. Parsed once, then cached for this process."""
+        if self._dict is None:
+            self._dict = json.loads(self.to_bytes().decode("utf-8"))
+        return self._dict
+
+    def close(self):
+        """Release the buffer and its underlying mapping"""
+        if self._buffer is None:
+            return
+        self._buffer.release()
+        self._buffer = None
+        if self._close_callback is not None:
+            self._close_callback()
+            self._close_callback = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @classmethod
+    def publish_file(cls, spec, path):
+        """Serialize spec into given file and attach to it
+
+        File is written atomically, so workers attaching concurrently never
+        read a partial spec.
+
+        :param APISpec|dict spec: APISpec object or its dict representation
+        :param str path: destination file path
+        :return: SharedSpec attached to written file
+        """
+        data = dump_spec(spec)
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as file_:
+                file_.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return cls.attach_file(path)
+
+    @classmethod
+    def attach_file(cls, path):
+        """Attach read-only to a spec file written by `publish_file`
+
+        :param str path: spec file path
+        :return: SharedSpec mapping given file
+        """
+        with open(path, "rb") as file_:
+            mapping = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(memoryview(mapping), close_callback=mapping.close)
+
+    @classmethod
+    def publish_shared_memory(cls, spec, name=None):
+        """Serialize spec into a new shared memory block
+
+        Block is owned by caller process which must call `unlink` once workers
+        don't need it anymore.
+
+        :param APISpec|dict spec: APISpec object or its dict representation
+        :param str name: shared memory block name, generated if not given
+        :return: SharedSpec attached to created block (its name is available
+            with `name` attribute)
+        """
+        if shared_memory is None:
+            raise RuntimeError("shared memory requires python >= 3.8")
+        data = dump_spec(spec)
+        block = shared_memory.SharedMemory(
+            name=name, create=True, size=_SHM_HEADER.size + len(data)
+        )
+        _SHM_HEADER.pack_into(block.buf, 0, len(data))
+        block.buf[_SHM_HEADER.size : _SHM_HEADER.size + len(data)] = data
+        shared_spec = cls._from_shared_memory(block)
+        shared_spec._block = block
+        return shared_spec
+
+    @classmethod
+    def attach_shared_memory(cls, name):
+        """Attach read-only to a shared memory block created by
+        `publish_shared_memory`
+
+        :param str name: shared memory block name
+        :return: SharedSpec viewing given block
+        """
+        if shared_memory is None:
+            raise RuntimeError("shared memory requires python >= 3.8")
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # python < 3.13
+            block = shared_memory.SharedMemory(name=name)
+            # Prevent attaching processes to destroy block when they exit
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(block._name, "shared_memory")
+        return cls._from_shared_memory(block)
+
+    @classmethod
+    def _from_shared_memory(cls, block):
+        (length,) = _SHM_HEADER.unpack_from(block.buf, 0)
+        buffer = block.buf[_SHM_HEADER.size : _SHM_HEADER.size + length].toreadonly()
+        return cls(buffer, close_callback=block.close, name=block.name)
+
+    def unlink(self):
+        """Destroy shared memory block. Only for the publishing process."""
+        if self._block is None:
+            raise RuntimeError("Only the publishing SharedSpec can unlink its block")
+        self.close()
+        self._block.unlink()
+        self._block = None
@@ -0,0 +1,140 @@
+# coding: utf-8
+"""Source fingerprints of dataclasses, used to key conversion caches so they
+survive module reloads (dev autoreload) without serving stale schemas.
+
+The fingerprint of a dataclass covers the files of its module and of the
+modules of all types it references (path, mtime and size of each file).
+"""
+import os
+import sys
+import weakref
+
+from serpyco.field import _metadata_name
+import typing_inspect
+
+from apispec_serpyco.hints import get_type_hints
+import dataclasses
+
+# Referenced modules of each dataclass (class objects are not modified once
+# defined: a reload creates new ones)
+_referenced_modules = weakref.WeakKeyDictionary()
+
+# Modules whose types can't change between reloads
+_STATIC_MODULES = ("builtins", "typing")
+
+
+class _UntrackedTypeError(TypeError):
+    """Raised when the module defining a referenced type is unknown"""
+
+
+def _add_module(object_, modules):
+    module_name = getattr(object_, "__module__", None)
+    if not isinstance(module_name, str):
+        raise _UntrackedTypeError(object_)
+    if module_name not in _STATIC_MODULES:
+        modules.add(module_name)
+
+
+def _collect_field_modules(field, modules, seen):
+    """Collect modules of objects given in serpyco field hints"""
+    field_hints = field.metadata.get(_metadata_name)
+    if field_hints is None:
+        return
+    for type_, encoder in (getattr(field_hints, "type_encoders", None) or {}).items():
+        _collect_modules(type_, modules, seen)
+        _add_module(type(encoder), modules)
+    load_as_type = getattr(field_hints, "load_as_type", None)
+    if load_as_type is not None:
+        _collect_modules(load_as_type, modules, seen)
+
+
+def _collect_modules(type_, modules, seen):
+    try:
+        if type_ in seen:
+            return
+        seen.add(type_)
+    except TypeError:  # Unhashable type argument (eg. Literal of a list)
+        pass
+
+    origin = typing_inspect.get_origin(type_)
+    if origin is not None and dataclasses.is_dataclass(origin):
+        _collect_modules(origin, modules, seen)
+    elif isinstance(type_, type) and dataclasses.is_dataclass(type_):
+        _add_module(type_, modules)
+        for hint in get_type_hints(type_).values():
+            _collect_modules(hint, modules, seen)
+        for field in dataclasses.fields(type_):
+            _collect_field_modules(field, modules, seen)
+            if field.default_factory is not dataclasses.MISSING:
+                _add_module(field.default_factory, modules)
+    elif isinstance(type_, type):
+        # Enums and other custom types
+        _add_module(type_, modules)
+    elif hasattr(type_, "__supertype__"):  # typing.NewType
+        _add_module(type_, modules)
+        _collect_modules(type_.__supertype__, modules, seen)
+
+    for argument in typing_inspect.get_args(type_, evaluate=True):
+        _collect_modules(argument, modules, seen)
+
+
+def get_referenced_modules(dataclass_):
+    """Return names of modules defining the dataclass and the types it
+    references (recursively): dataclasses, enums and other custom types,
+    serpyco field encoders and default factories
+
+    :param type dataclass_: dataclass
+    :return: frozenset of module names, None if type hints can't be resolved
+        or if the module of a referenced type is unknown
+    """
+    try:
+        return _referenced_modules[dataclass_]
+    except KeyError:
+        pass
+
+    modules = set()
+    try:
+        _collect_modules(dataclass_, modules, set())
+    except (NameError, TypeError):
+        modules = None
+    else:
+        modules = frozenset(modules)
+    return _referenced_modules.setdefault(dataclass_, modules)
+
+
+def get_file_fingerprint(path):
+    """Return [path, mtime_ns, size] of a file, None if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [path, stat.st_mtime_ns, stat.st_size]
+
+
+def get_source_fingerprint(dataclass_):
+    """Return the source fingerprint of a dataclass
+
+    :param type dataclass_: dataclass
+    :return: sorted list of [path, mtime_ns, size] (json serializable), None if
+        a referenced module has no source file (eg. defined interactively)
+    """
+    modules = get_referenced_modules(dataclass_)
+    if modules is None:
+        return None
+
+    fingerprint = []
+    for module_name in sorted(modules):
+        path = getattr(sys.modules.get(module_name), "__file__", None)
+        file_fingerprint = path and get_file_fingerprint(path)
+        if not file_fingerprint:
+            return None
+        fingerprint.append(file_fingerprint)
+    return fingerprint
+
+
+def is_fingerprint_current(fingerprint):
+    """Return True if no file of given fingerprint changed"""
+    return all(
+        get_file_fingerprint(file_fingerprint[0]) == file_fingerprint
+        for file_fingerprint in fingerprint
+    )
@@ -0,0 +1,452 @@
+# coding: utf-8
+"""Compile JSON schemas of a spec into validation callables.
+
+Each schema is compiled once into nested closures specialized for its
+keywords, instead of walking the schema dict for each validated payload.
+Components are compiled on first use and cached by reference, so recursive
+components are supported.
+
+Supported keywords are the ones emitted by `SerpycoPlugin` and usual OpenAPI
+ones: "$ref", "type", "nullable", "enum", "const", "properties", "required",
+"additionalProperties", "minProperties", "maxProperties", "items" (schema or
+list of schemas), "minItems", "maxItems", "uniqueItems", "minLength",
+"maxLength", "pattern", "minimum", "maximum", "exclusiveMinimum",
+"exclusiveMaximum", "multipleOf", "allOf", "anyOf", "oneOf" and "not". Other
+keywords (like "format") are ignored.
+"""
+import re
+
+from apispec_serpyco.refs import get_ref_target
+from apispec_serpyco.refs import ref_to_path
+
+_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+    "null": type(None),
+}
+
+
+class ValidationError(ValueError):
+    """Raised by validators when data doesn't match a schema
+
+    :param str message: error message
+    """
+
+    def __init__(self, message):
+        super(ValidationError, self).__init__(message)
+        self.message = message
+        # Path of invalid data, filled in reverse order while unwinding
+        self._reversed_path = []
+
+    @property
+    def path(self):
+        """Path of invalid data in validated data, as a tuple of keys and
+        indexes"""
+        return tuple(reversed(self._reversed_path))
+
+    def __str__(self):
+        if not self._reversed_path:
+            return self.message
+        return "{}: {}".format("/".join(str(part) for part in self.path), self.message)
+
+
+def _is_type(data, type_name):
+    if type_name in ("integer", "number"):
+        if isinstance(data, bool):
+            return False
+        if type_name == "integer" and isinstance(data, float):
+            return data.is_integer()
+    return isinstance(data, _TYPES[type_name])
+
+
+def _all_of(validators):
+    """Return one validator running all given ones"""
+    if not validators:
+        return _validate_anything
+    if len(validators) == 1:
+        return validators[0]
+    if len(validators) == 2:
+        first, second = validators
+
+        def validate(data):
+            first(data)
+            second(data)
+
+        return validate
+
+    validators = tuple(validators)
+
+    def validate(data):
+        for validator in validators:
+            validator(data)
+
+    return validate
+
+
+def _validate_anything(data):
+    pass
+
+
+def _compile_type(type_names):
+    if isinstance(type_names, str):
+        type_names = [type_names]
+    type_names = [type_name for type_name in type_names if type_name in _TYPES]
+    message = "{{!r}} is not of type {}".format(", ".join(map(repr, type_names)))
+
+    if "integer" not in type_names and "number" not in type_names:
+        python_types = tuple(_TYPES[type_name] for type_name in type_names)
+
+        def validate(data):
+            if not isinstance(data, python_types):
+                raise ValidationError(message.format(data))
+
+        return validate
+
+    # bool is an int subclass, and integer type accepts integral floats
+    def validate(data):
+        if type(data) is int or type(data) is float and "number" in type_names:
+            return
+        if not any(_is_type(data, type_name) for type_name in type_names):
+            raise ValidationError(message.format(data))
+
+    return validate
+
+
+def _get_json_key(data):
+    """Return a hashable key of json data, equal for equal json values:
+    numbers are equal by value (1 and 1.0 are), but not to booleans (True and
+    1 are not)"""
+    if data is None or isinstance(data, (bool, str)):
+        return (type(data), data)
+    if isinstance(data, (int, float)):
+        return ("number", data)
+    if isinstance(data, (list, tuple)):
+        return ("array", tuple(_get_json_key(item) for item in data))
+    if isinstance(data, dict):
+        return (
+            "object",
+            frozenset((key, _get_json_key(value)) for key, value in data.items()),
+        )
+    return (type(data), data)
+
+
+def _compile_enum(values):
+    allowed = frozenset(_get_json_key(value) for value in values)
+
+    def validate(data):
+        if _get_json_key(data) not in allowed:
+            raise ValidationError("{!r} is not one of {!r}".format(data, values))
+
+    return validate
+
+
+def _compile_string(schema):
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+    pattern = schema.get("pattern")
+    if min_length is None and max_length is None and pattern is None:
+        return None
+    search = re.compile(pattern).search if pattern is not None else None
+
+    def validate(data):
+        if not isinstance(data, str):
+            return
+        if min_length is not None and len(data) < min_length:
+            raise ValidationError("{!r} is too short".format(data))
+        if max_length is not None and len(data) > max_length:
+            raise ValidationError("{!r} is too long".format(data))
+        if search is not None and search(data) is None:
+            raise ValidationError("{!r} does not match {!r}".format(data, pattern))
+
+    return validate
+
+
+def _compile_number(schema):
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    exclusive_minimum = schema.get("exclusiveMinimum")
+    exclusive_maximum = schema.get("exclusiveMaximum")
+    multiple_of = schema.get("multipleOf")
+    # OpenAPI (and JSON schema draft 4) use booleans for exclusive bounds
+    if exclusive_minimum is True:
+        exclusive_minimum, minimum = minimum, None
+    elif exclusive_minimum is False:
+        exclusive_minimum = None
+    if exclusive_maximum is True:
+        exclusive_maximum, maximum = maximum, None
+    elif exclusive_maximum is False:
+        exclusive_maximum = None
+    if (
+        minimum is None
+        and maximum is None
+        and exclusive_minimum is None
+        and exclusive_maximum is None
+        and multiple_of is None
+    ):
+        return None
+
+    def validate(data):
+        if not isinstance(data, (int, float)) or isinstance(data, bool):
+            return
+        if minimum is not None and data < minimum:
+            raise ValidationError("{!r} is less than {!r}".format(data, minimum))
+        if maximum is not None and data > maximum:
+            raise ValidationError("{!r} is greater than {!r}".format(data, maximum))
+        if exclusive_minimum is not None and data <= exclusive_minimum:
+            raise ValidationError(
+                "{!r} is less than or equal to {!r}".format(data, exclusive_minimum)
+            )
+        if exclusive_maximum is not None and data >= exclusive_maximum:
+            raise ValidationError(
+                "{!r} is greater than or equal to {!r}".format(data, exclusive_maximum)
+            )
+        if multiple_of is not None:
+            quotient = data / multiple_of
+            if quotient != int(quotient):
+                raise ValidationError(
+                    "{!r} is not a multiple of {!r}".format(data, multiple_of)
+                )
+
+    return validate
+
+
+def _compile_object(schema, compile_schema):
+    properties = {
+        name: compile_schema(property_)
+        for name, property_ in schema.get("properties", {}).items()
+    }
+    required = tuple(schema.get("required", ()))
+    additional = schema.get("additionalProperties", True)
+    min_properties = schema.get("minProperties")
+    max_properties = schema.get("maxProperties")
+    if isinstance(additional, dict):
+        additional = compile_schema(additional)
+    if (
+        not properties
+        and not required
+        and additional is True
+        and min_properties is None
+        and max_properties is None
+    ):
+        return None
+
+    def validate(data):
+        if not isinstance(data, dict):
+            return
+        for name in required:
+            if name not in data:
+                raise ValidationError("{!r} is a required property".format(name))
+        if min_properties is not None and len(data) < min_properties:
+            raise ValidationError("Object has too few properties")
+        if max_properties is not None and len(data) > max_properties:
+            raise ValidationError("Object has too many properties")
+        for name, value in data.items():
+            validator = properties.get(name)
+            if validator is None:
+                if additional is True:
+                    continue
+                if additional is False:
+                    raise ValidationError(
+                        "Additional property {!r} is not allowed".format(name)
+                    )
+                validator = additional
+            try:
+                validator(value)
+            except ValidationError as error:
+                error._reversed_path.append(name)
+                raise
+
+    return validate
+
+
+def _compile_array(schema, compile_schema):
+    items = schema.get("items")
+    min_items = schema.get("minItems")
+    max_items = schema.get("maxItems")
+    unique_items = schema.get("uniqueItems", False)
+    if isinstance(items, list):
+        items = tuple(compile_schema(item) for item in items)
+    elif items is not None:
+        items = compile_schema(items)
+    if items is None and min_items is None and max_items is None and not unique_items:
+        return None
+
+    def validate(data):
+        if not isinstance(data, list):
+            return
+        if min_items is not None and len(data) < min_items:
+            raise ValidationError("Array is too short")
+        if max_items is not None and len(data) > max_items:
+            raise ValidationError("Array is too long")
+        if unique_items:
+            seen = set()
+            for item in data:
+                key = _get_json_key(item)
+                if key in seen:
+                    raise ValidationError("Array has non-unique items")
+                seen.add(key)
+        if items is None:
+            return
+        index = 0
+        try:
+            if isinstance(items, tuple):
+                for index, (validator, item) in enumerate(zip(items, data)):
+                    validator(item)
+            else:
+                for index, item in enumerate(data):
+                    items(item)
+        except ValidationError as error:
+            error._reversed_path.append(index)
+            raise
+
+    return validate
+
+
+def _compile_any_of(validators, one_of=False):
+    validators = tuple(validators)
+    keyword = "oneOf" if one_of else "anyOf"
+
+    def validate(data):
+        matches = 0
+        for validator in validators:
+            try:
+                validator(data)
+            except ValidationError:
+                continue
+            if not one_of:
+                return
+            matches += 1
+        if matches != 1:
+            raise ValidationError(
+                "{!r} is not valid under {} schemas".format(
+                    data, "exactly one of" if matches else keyword
+                )
+            )
+
+    return validate
+
+
+def _compile_not(validator):
+    def validate(data):
+        try:
+            validator(data)
+        except ValidationError:
+            return
+        raise ValidationError("{!r} should not be valid".format(data))
+
+    return validate
+
+
+class ValidatorCompiler(object):
+    """Compile schemas of a spec into validation callables, caching
+    validators of referenced components
+
+    A validator is a callable taking data (as loaded from json) and raising
+    `ValidationError` if data doesn't match its schema.
+
+    :param APISpec|dict spec: APISpec object or its dict representation,
+        where "$ref" are resolved
+    """
+
+    def __init__(self, spec):
+        self._spec = spec
+        # Validators of referenced schemas, keyed by "$ref" value
+        self._validators = {}
+
+    def _get_spec_dict(self):
+        if isinstance(self._spec, dict):
+            return self._spec
+        return self._spec.to_dict()
+
+    def get_validator(self, ref):
+        """Return the (cached) validator of a referenced schema
+
+        :param str ref: "$ref" value, like "#/components/schemas/Pet"
+        :raise KeyError: if reference target doesn't exist
+        """
+        try:
+            return self._validators[ref]
+        except KeyError:
+            pass
+
+        path = ref_to_path(ref)
+        schema = None if path is None else get_ref_target(self._get_spec_dict(), path)
+        if schema is None:
+            raise KeyError(ref)
+
+        # Recursive references are resolved when validating
+        validators = self._validators
+        validators[ref] = lambda data: validators[ref](data)
+        try:
+            validators[ref] = self.compile(schema)
+        except Exception:
+            del validators[ref]
+            raise
+        return validators[ref]
+
+    def _compile_ref(self, ref):
+        validators = self._validators
+        if ref in validators:
+            return validators[ref]
+
+        def validate(data):
+            # Referenced schema may be registered after referencing one
+            try:
+                validator = validators[ref]
+            except KeyError:
+                validator = self.get_validator(ref)
+            validator(data)
+
+        return validate
+
+    def compile(self, schema):
+        """Return a validator of given schema
+
+        :param dict schema: JSON schema (or OpenAPI schema object)
+        """
+        if "$ref" in schema:
+            return self._compile_ref(schema["$ref"])
+
+        validators = []
+        if "type" in schema:
+            validators.append(_compile_type(schema["type"]))
+        if "enum" in schema:
+            validators.append(_compile_enum(schema["enum"]))
+        if "const" in schema:
+            validators.append(_compile_enum([schema["const"]]))
+        for compile_keywords in (_compile_string, _compile_number):
+            validator = compile_keywords(schema)
+            if validator is not None:
+                validators.append(validator)
+        for compile_keywords in (_compile_object, _compile_array):
+            validator = compile_keywords(schema, self.compile)
+            if validator is not None:
+                validators.append(validator)
+        for sub_schema in schema.get("allOf", ()):
+            validators.append(self.compile(sub_schema))
+        if "anyOf" in schema:
+            validators.append(
+                _compile_any_of(self.compile(item) for item in schema["anyOf"])
+            )
+        if "oneOf" in schema:
+            validators.append(
+                _compile_any_of(
+                    (self.compile(item) for item in schema["oneOf"]), one_of=True
+                )
+            )
+        if "not" in schema:
+            validators.append(_compile_not(self.compile(schema["not"])))
+
+        validator = _all_of(validators)
+        if schema.get("nullable"):
+            not_null_validator = validator
+
+            def validator(data):
+                if data is not None:
+                    not_null_validator(data)
+
+        return validator
@@ -0,0 +1,36 @@
+# coding: utf-8
+"""Compare canonical json encoding backends on a synthetic large spec
+
+Usage: python benchmarks/bench_encoding.py [component count] [repeat]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apispec_serpyco.encoding import available_backends  # noqa: E402
+from apispec_serpyco.encoding import dumps_canonical  # noqa: E402
+from benchmarks.synthetic import make_large_spec  # noqa: E402
+
+
+def main(count=2000, repeat=10):
+    spec_dict = make_large_spec(count).to_dict()
+    reference = dumps_canonical(spec_dict, backend="json")
+    print(
+        "{} components, {} bytes, best of {} runs".format(count, len(reference), repeat)
+    )
+    for backend in available_backends():
+        assert dumps_canonical(spec_dict, backend=backend) == reference
+        duration = min(
+            timeit.repeat(
+                lambda: dumps_canonical(spec_dict, backend=backend),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        print("{:<10} {:8.2f} ms".format(backend, duration * 1000))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
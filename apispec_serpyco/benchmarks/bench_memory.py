@@ -0,0 +1,243 @@
+# coding: utf-8
+"""Memory footprint of spec generation on synthetic large models
+
+For each scenario, report peak traced allocations, memory retained after
+build and top allocating call sites (with tracemalloc), and compare peak and
+retained memory with stored baselines.
+
+Usage:
+    python benchmarks/bench_memory.py [--count 500] [--tolerance 0.1]
+    python benchmarks/bench_memory.py --update  # store new baselines
+
+Exit code is 1 if a scenario exceeds its baseline by more than tolerance.
+Baselines are stored per interpreter (implementation and major.minor version)
+and models count: measures of other interpreters are not compared.
+
+On Python < 3.9 (no `tracemalloc.reset_peak`), peak includes the snapshot
+taken before build.
+"""
+import argparse
+import collections
+import gc
+import json
+import os
+import platform
+import sys
+import tracemalloc
+
+BENCHMARKS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIRECTORY))
+# Sibling package, for marshmallow scenario
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(BENCHMARKS_DIRECTORY)),
+        "apispec_marshmallow_advanced",
+    ),
+)
+
+from benchmarks import synthetic  # noqa: E402
+
+BASELINES_PATH = os.path.join(BENCHMARKS_DIRECTORY, "memory_baselines.json")
+
+MemoryReport = collections.namedtuple(
+    "MemoryReport", ("scenario", "peak", "retained", "top_sites")
+)
+MemoryReport.__doc__ = """Memory footprint of one scenario
+
+:param str scenario: scenario name
+:param int peak: peak traced allocations during build (bytes)
+:param int retained: memory still allocated after build (bytes)
+:param list top_sites: (call site, retained bytes) of top allocating lines
+"""
+
+
+def measure(scenario, prepare, build, top=10):
+    """Measure memory allocated by build(prepare())
+
+    :param str scenario: scenario name
+    :param prepare: callable returning build argument (not measured)
+    :param build: callable to measure, its result is kept during measure
+    :param int top: count of call sites to report
+    :return: MemoryReport
+    """
+    argument = prepare()
+    gc.collect()
+    tracemalloc.start(1)
+    try:
+        before = tracemalloc.take_snapshot()
+        start_current, _ = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, "reset_peak"):  # Python >= 3.9
+            tracemalloc.reset_peak()
+        result = build(argument)
+        _, peak = tracemalloc.get_traced_memory()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    top_sites = [
+        (
+            "{}:{}".format(stat.traceback[0].filename, stat.traceback[0].lineno),
+            stat.size_diff,
+        )
+        for stat in after.filter_traces(filters).compare_to(
+            before.filter_traces(filters), "lineno"
+        )[:top]
+    ]
+    return MemoryReport(
+        scenario, peak - start_current, current - start_current, top_sites
+    )
+
+
+def _register_all(spec_and_models, register):
+    spec, models = spec_and_models
+    register(spec, models)
+    return spec
+
+
+def get_scenarios(count):
+    """Return scenarios as (name, prepare, build) tuples"""
+    scenarios = [
+        (
+            "serpyco_schemas",
+            lambda: (synthetic.make_spec(), synthetic.make_dataclasses(count)),
+            lambda argument: _register_all(argument, synthetic.register_schemas),
+        ),
+        (
+            "serpyco_paths",
+            lambda: (synthetic.make_spec(), synthetic.make_dataclasses(count)),
+            lambda argument: _register_all(argument, synthetic.register_paths),
+        ),
+    ]
+
+    try:
+        from apispec_marshmallow_advanced import MarshmallowAdvancedPlugin
+    except ImportError:
+        sys.stderr.write("marshmallow scenario skipped (not installed)\n")
+    else:
+        scenarios.append(
+            (
+                "marshmallow_schemas",
+                lambda: (
+                    synthetic.make_spec(plugins=(MarshmallowAdvancedPlugin(),)),
+                    synthetic.make_marshmallow_schemas(count),
+                ),
+                lambda argument: _register_all(argument, synthetic.register_schemas),
+            )
+        )
+    return scenarios
+
+
+def get_environment(count):
+    """Return the environment baselines are measured in"""
+    return {
+        "count": count,
+        "implementation": platform.python_implementation(),
+        "python": ".".join(platform.python_version_tuple()[:2]),
+    }
+
+
+def load_baselines():
+    """Return stored baselines, as a list of {"environment", "scenarios"}"""
+    try:
+        with open(BASELINES_PATH) as file_:
+            return json.load(file_)["baselines"]
+    except FileNotFoundError:
+        return []
+
+
+def compare(report, baseline, tolerance):
+    """Return regression messages of report compared to its baseline"""
+    messages = []
+    for key in ("peak", "retained"):
+        limit = baseline[key] * (1 + tolerance)
+        if getattr(report, key) > limit:
+            messages.append(
+                "{} {}: {} bytes, baseline {} bytes (+{:.1%})".format(
+                    report.scenario,
+                    key,
+                    getattr(report, key),
+                    baseline[key],
+                    getattr(report, key) / baseline[key] - 1,
+                )
+            )
+    return messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure memory footprint of spec generation"
+    )
+    parser.add_argument("--count", type=int, default=500, help="models count")
+    parser.add_argument("--top", type=int, default=5, help="reported call sites")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--update", action="store_true", help="store baselines")
+    args = parser.parse_args(argv)
+
+    reports = [
+        measure(name, prepare, build, top=args.top)
+        for name, prepare, build in get_scenarios(args.count)
+    ]
+    for report in reports:
+        print(
+            "{}: peak {:.1f} KiB, retained {:.1f} KiB".format(
+                report.scenario, report.peak / 1024, report.retained / 1024
+            )
+        )
+        for site, size in report.top_sites:
+            print("    {:>10.1f} KiB  {}".format(size / 1024, site))
+
+    environment = get_environment(args.count)
+    # Baselines of other environments are kept
+    stored = [
+        baselines
+        for baselines in load_baselines()
+        if baselines["environment"] != environment
+    ]
+    if args.update:
+        stored.append(
+            {
+                "environment": environment,
+                "scenarios": {
+                    report.scenario: {"peak": report.peak, "retained": report.retained}
+                    for report in reports
+                },
+            }
+        )
+        stored.sort(key=lambda baselines: sorted(baselines["environment"].items()))
+        with open(BASELINES_PATH, "w") as file_:
+            json.dump({"baselines": stored}, file_, indent=2, sort_keys=True)
+            file_.write("\n")
+        return 0
+
+    baselines = next(
+        (
+            baselines
+            for baselines in load_baselines()
+            if baselines["environment"] == environment
+        ),
+        None,
+    )
+    if baselines is None:
+        print(
+            "No baselines for {}, run with --update to store them".format(environment)
+        )
+        return 0
+
+    messages = []
+    for report in reports:
+        if report.scenario in baselines["scenarios"]:
+            messages += compare(
+                report, baselines["scenarios"][report.scenario], args.tolerance
+            )
+    for message in messages:
+        print("REGRESSION " + message)
+    return 1 if messages else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
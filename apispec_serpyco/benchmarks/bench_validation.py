@@ -0,0 +1,65 @@
+# coding: utf-8
+"""Compare compiled validators with jsonschema (if installed) on payloads of
+synthetic schema components
+
+Usage: python benchmarks/bench_validation.py [payload count] [repeat]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apispec_serpyco import SerpycoPlugin  # noqa: E402
+from benchmarks.synthetic import make_dataclasses  # noqa: E402
+from benchmarks.synthetic import make_spec  # noqa: E402
+from benchmarks.synthetic import register_schemas  # noqa: E402
+
+
+def make_payload(depth):
+    """Return a valid payload of the `depth`-th dataclass of a chain"""
+    payload = {"id": depth, "name": "name", "ratio": 0.5, "tags": ["a", "b"]}
+    if depth:
+        payload["parent"] = make_payload(depth - 1)
+    return payload
+
+
+def main(count=10000, repeat=5):
+    spec = make_spec(plugins=(SerpycoPlugin(),))
+    # Deepest dataclass of a chain nests the 7 others
+    dataclasses_ = make_dataclasses(8)
+    register_schemas(spec, dataclasses_)
+    name = dataclasses_[-1].__name__
+    payloads = [make_payload(7) for _ in range(count)]
+
+    validate = spec.plugins[0].get_validator(name)
+    validators = {"compiled": validate}
+    try:
+        import jsonschema
+    except ImportError:
+        print("jsonschema is not installed, only compiled validators are measured")
+    else:
+        spec_dict = spec.to_dict()
+        validator = jsonschema.Draft4Validator(
+            {"$ref": "#/components/schemas/{}".format(name), **spec_dict}
+        )
+        validators["jsonschema"] = validator.validate
+
+    print("{} payloads (8 nested objects each), best of {} runs".format(count, repeat))
+    for validator_name, validator in validators.items():
+        duration = min(
+            timeit.repeat(
+                lambda: [validator(payload) for payload in payloads],
+                number=1,
+                repeat=repeat,
+            )
+        )
+        print(
+            "{:<12} {:8.2f} ms {:10.0f} payloads/s".format(
+                validator_name, duration * 1000, count / duration
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,98 @@
+# coding: utf-8
+"""Synthetic large spec, made of generated dataclasses and paths"""
+import typing
+
+from apispec import APISpec
+
+from apispec_serpyco import SerpycoPlugin
+from apispec_serpyco.registry import SchemaBuilderRegistry
+import dataclasses
+
+
+def make_dataclasses(count):
+    """Return `count` dataclasses, in chains of 8 dataclasses referencing the
+    previous one"""
+    dataclasses_ = []
+    for index in range(count):
+        fields = [
+            ("id", int),
+            ("name", str, dataclasses.field(default="name")),
+            ("ratio", float, dataclasses.field(default=0.5)),
+            ("tags", typing.List[str], dataclasses.field(default_factory=list)),
+        ]
+        if index % 8:
+            parent = typing.Optional[dataclasses_[index - 1]]
+            fields.append(("parent", parent, dataclasses.field(default=None)))
+        dataclasses_.append(dataclasses.make_dataclass("Model{}".format(index), fields))
+    return dataclasses_
+
+
+def make_spec(openapi_version="3.0.0", plugins=None):
+    """Return an empty spec, with a SerpycoPlugin (and its own registry) by
+    default"""
+    if plugins is None:
+        plugins = (SerpycoPlugin(builder_registry=SchemaBuilderRegistry()),)
+    return APISpec(
+        title="Synthetic",
+        version="1.0",
+        openapi_version=openapi_version,
+        plugins=plugins,
+    )
+
+
+def register_schemas(spec, schemas):
+    """Register each schema (dataclass or marshmallow schema) as a component"""
+    for schema in schemas:
+        spec.components.schema(schema.__name__, schema=schema)
+
+
+def register_paths(spec, schemas):
+    """Register one path per schema, responding with this schema"""
+    for schema in schemas:
+        name = schema.__name__
+        spec.path(
+            path="/{}/{{id}}".format(name.lower()),
+            operations={
+                "get": {
+                    "summary": "Get one {}".format(name),
+                    "responses": {
+                        "200": {
+                            "description": "A {}".format(name),
+                            "content": {"application/json": {"schema": schema}},
+                        }
+                    },
+                }
+            },
+        )
+
+
+def make_large_spec(count=500, openapi_version="3.0.0"):
+    """Return a spec with `count` schema components and `count` paths"""
+    spec = make_spec(openapi_version)
+    dataclasses_ = make_dataclasses(count)
+    register_schemas(spec, dataclasses_)
+    register_paths(spec, dataclasses_)
+    return spec
+
+
+def make_marshmallow_schemas(count):
+    """Return `count` marshmallow schemas, in chains of 8 schemas nesting the
+    previous one (same shape as `make_dataclasses`)"""
+    import marshmallow
+
+    schemas = []
+    for index in range(count):
+        fields = {
+            "id": marshmallow.fields.Integer(required=True),
+            "name": marshmallow.fields.String(missing="name"),
+            "ratio": marshmallow.fields.Float(missing=0.5),
+            "tags": marshmallow.fields.List(marshmallow.fields.String()),
+        }
+        if index % 8:
+            fields["parent"] = marshmallow.fields.Nested(
+                schemas[index - 1], allow_none=True
+            )
+        schemas.append(
+            type("Model{}Schema".format(index), (marshmallow.Schema,), fields)
+        )
+    return schemas
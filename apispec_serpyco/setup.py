@@ -19,6 +19,6 @@ setup(
         "License :: OSI Approved :: MIT License",
     ],
     install_requires=["apispec>=1.1.0,<3", "serpyco>=0.18.0", "typing-inspect"],
-    extras_require={"test": ["pytest"]},
+    extras_require={"test": ["pytest"], "fast_json": ["python-rapidjson"]},
     data_files = [("", ["LICENSE"])],
 )
@@ -3,6 +3,7 @@ from collections import namedtuple
 
 from apispec import APISpec
 import pytest
+import serpyco
 
 from apispec_serpyco import SerpycoPlugin
 
@@ -28,3 +29,17 @@ def spec_fixture(request):
 @pytest.fixture(params=("2.0", "3.0.0"))
 def spec(request):
     return make_spec(request.param).spec
+
+
+@pytest.fixture
+def converted(monkeypatch):
+    """List of dataclasses given to serpyco.SchemaBuilder during the test"""
+    dataclasses_ = []
+    schema_builder = serpyco.SchemaBuilder
+
+    def make_schema_builder(dataclass_, *args, **kwargs):
+        dataclasses_.append(dataclass_)
+        return schema_builder(dataclass_, *args, **kwargs)
+
+    monkeypatch.setattr(serpyco, "SchemaBuilder", make_schema_builder)
+    return dataclasses_
@@ -0,0 +1,127 @@
+# coding: utf-8
+import asyncio
+
+import pytest
+
+from apispec_serpyco.builder import AsyncSpecBuilder
+from apispec_serpyco.builder import SpecBuilder
+from tests.test_ext_serpyco import AnalysisSchema
+from tests.test_ext_serpyco import PetSchema
+from tests.utils import get_definitions
+from tests.utils import get_paths
+
+
+def _record(builder):
+    builder.schema("Pet", schema=PetSchema)
+    builder.schema("Analysis", schema=AnalysisSchema)
+    builder.path("/pets", operations={"get": {"responses": {"200": {}}}})
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+class _Flaky(object):
+    """Registration failing on first run"""
+
+    def __init__(self):
+        self.runs = 0
+
+    def __call__(self):
+        self.runs += 1
+        if self.runs == 1:
+            raise ValueError("first run")
+
+
+class TestSpecBuilder:
+    def test_registrations_are_deferred(self, spec):
+        builder = SpecBuilder(spec)
+        _record(builder)
+
+        assert 3 == builder.pending_count
+        assert {} == get_definitions(spec)
+
+        assert spec is builder.build()
+        assert 0 == builder.pending_count
+        assert {"Pet", "Analysis"} <= set(get_definitions(spec))
+        assert "/pets" in get_paths(spec)
+
+    def test_iter_build_reports_progress(self, spec):
+        builder = SpecBuilder(spec)
+        _record(builder)
+
+        progresses = builder.iter_build()
+        first = next(progresses)
+        assert (1, 3, "schema", "Pet") == (
+            first.done,
+            first.total,
+            first.step.kind,
+            first.step.name,
+        )
+        assert ["Pet"] == list(get_definitions(spec))
+
+        # A new generator resumes the build
+        assert [(2, 3, "Analysis"), (3, 3, "/pets")] == [
+            (progress.done, progress.total, progress.step.name)
+            for progress in builder.iter_build()
+        ]
+        assert "/pets" in get_paths(spec)
+
+    def test_run_for_stops_after_budget(self, spec):
+        builder = SpecBuilder(spec)
+        _record(builder)
+
+        progress = builder.run_for(0)
+        assert 1 == progress.done
+        assert 2 == builder.pending_count
+        assert 3 == builder.run_for(60).done
+        assert builder.run_for(60) is None
+
+
+class TestAsyncSpecBuilder:
+    def test_concurrent_builds_are_shared(self, spec, loop):
+        builder = AsyncSpecBuilder(spec)
+        _record(builder)
+        runs = []
+        run_chunk = builder._run_chunk
+
+        def counting_run_chunk():
+            runs.append(builder.pending_count)
+            run_chunk()
+
+        builder._run_chunk = counting_run_chunk
+
+        async def build():
+            return await asyncio.gather(
+                builder.get_spec_dict(), builder.get_spec_dict()
+            )
+
+        first, second = loop.run_until_complete(build())
+        assert first is second
+        assert [3, 2, 1] == runs
+        assert {"Pet", "Analysis"} <= set(first.get("definitions", {})) | set(
+            first.get("components", {}).get("schemas", {})
+        )
+
+        # Cached until a new registration
+        assert first is loop.run_until_complete(builder.get_spec_dict())
+        builder.path("/analysis", operations={"get": {"responses": {"200": {}}}})
+        assert "/analysis" in loop.run_until_complete(builder.get_spec_dict())["paths"]
+
+    def test_failed_build_is_not_cached(self, spec, loop):
+        builder = AsyncSpecBuilder(spec)
+        flaky = _Flaky()
+        builder._add_step("schema", "Flaky", flaky)
+        _record(builder)
+
+        with pytest.raises(ValueError):
+            loop.run_until_complete(builder.get_spec())
+        # Failed registration is kept
+        assert 4 == builder.pending_count
+
+        assert spec is loop.run_until_complete(builder.get_spec())
+        assert 2 == flaky.runs
+        assert 0 == builder.pending_count
@@ -0,0 +1,61 @@
+# coding: utf-8
+import json
+
+import pytest
+
+from apispec_serpyco.encoding import _dumps_orjson
+from apispec_serpyco.encoding import available_backends
+from apispec_serpyco.encoding import dumps_canonical
+from tests.test_ext_serpyco import AnalysisSchema
+from tests.test_ext_serpyco import PetSchema
+
+
+def _stdlib_dumps(data):
+    return json.dumps(
+        data, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+TRICKY_DATA = [
+    {"minimum": 1e-05, "maximum": 1e20, "multipleOf": 0.1},
+    {"ratio": 1.2345678901234567e19, "small": 5e-324, "negative_zero": -0.0},
+    {"description": "Pétanque \x1f\n/\\ \x22 \U0001f600", "b": 1, "a": 2, "Z": 3},
+    {"big": 10 ** 30, "default": None, "enum": (1, 2)},
+    {200: {"description": "int key"}},
+    {"nullable": True, "description": "null or 1e5, not 0.0000", "default": None},
+    {"enum": [None, 1e-07, 1e16, 12.5e3]},
+]
+
+
+class TestDumpsCanonical:
+    @pytest.mark.parametrize("backend", available_backends())
+    @pytest.mark.parametrize("data", TRICKY_DATA)
+    def test_backends_output_is_canonical(self, backend, data):
+        assert _stdlib_dumps(data) == dumps_canonical(data, backend=backend)
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_backends_output_for_spec(self, backend, spec):
+        spec.components.schema("Pet", schema=PetSchema)
+        spec.components.schema("Analysis", schema=AnalysisSchema)
+        spec_dict = spec.to_dict()
+        assert _stdlib_dumps(spec_dict) == dumps_canonical(spec_dict, backend=backend)
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_non_finite_floats_are_rejected(self, backend):
+        with pytest.raises(ValueError):
+            dumps_canonical({"maximum": float("inf")}, backend=backend)
+
+    def test_unknown_backend(self):
+        assert "json" == available_backends()[-1]
+        with pytest.raises(ValueError):
+            dumps_canonical({}, backend="unknown")
+
+    @pytest.mark.skipif(
+        "orjson" not in available_backends(), reason="orjson is not installed"
+    )
+    def test_orjson_output_checked_for_values_only(self):
+        data = {"nullable": True, "description": "null or 1e5", "maximum": 12.5}
+        assert _dumps_orjson(data) == _stdlib_dumps(data)
+        assert _dumps_orjson({"default": None}) is None
+        assert _dumps_orjson({"enum": ["a", None]}) is None
+        assert _dumps_orjson({"maximum": 1e16}) is None
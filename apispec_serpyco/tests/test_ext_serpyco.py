@@ -1,14 +1,18 @@
 # -*- coding: utf-8 -*-
+import copy
 import json
+import threading
 import typing
 
 from apispec import APISpec
+from apispec.exceptions import DuplicateComponentNameError
 import pytest
 import serpyco
 from serpyco import nested_field
 from serpyco import string_field
 
 from apispec_serpyco import SerpycoPlugin
+from apispec_serpyco.registry import SchemaBuilderRegistry
 from apispec_serpyco.utils import schema_name_resolver
 import dataclasses
 from dataclasses import dataclass
@@ -54,6 +58,11 @@ class SelfReferencingSchema(object):
     many: typing.List["SelfReferencingSchema"]
 
 
+@dataclass
+class UnionSelfReferencingSchema(object):
+    link: typing.Union["UnionSelfReferencingSchema", str]
+
+
 @dataclass
 class DefaultValuesSchema(object):
     number_auto_default: int = dataclasses.field(default=12)
@@ -63,6 +72,13 @@ class DefaultValuesSchema(object):
     numbers: typing.List[int] = dataclasses.field(default_factory=lambda: [])
 
 
+@dataclass
+class QuerySchema(object):
+    name: "str"
+    tags: "typing.List[str]"
+    ids: typing.Optional[typing.List[int]] = None
+
+
 class TestDefinitionHelper:
     @pytest.mark.parametrize("schema", [PetSchema])
     def test_can_use_schema_as_definition(self, spec, schema):
@@ -78,6 +94,17 @@ class TestDefinitionHelper:
         definitions = get_definitions(spec)
         assert definitions["Pet"]["properties"] == {"key": {"type": "integer"}}
 
+    def test_optional_nested_schema_reference(self, spec):
+        @dataclass
+        class OptionalNestedSchema(object):
+            sample: typing.Optional[SampleSchema] = None
+
+        spec.components.schema("OptionalNested", schema=OptionalNestedSchema)
+        definitions = get_definitions(spec)
+        assert definitions["OptionalNested"]["properties"]["sample"] == {
+            "$ref": ref_path(spec) + "tests.test_ext_serpyco.SampleSchema"
+        }
+
     @pytest.mark.parametrize("schema", [AnalysisSchema])
     def test_resolve_schema_dict_auto_reference(self, schema):
         def resolver(schema):
@@ -340,6 +367,27 @@ class TestOperationHelper:
         assert post["requestBody"]["description"] == "a pet schema"
         assert post["requestBody"]["required"]
 
+    def test_schema_expand_repeated_parameters(self, spec):
+        spec.path(
+            path="/pets",
+            operations={
+                "get": {"parameters": [{"in": "query", "schema": QuerySchema}]}
+            },
+        )
+        parameters = {
+            parameter["name"]: parameter
+            for parameter in get_paths(spec)["/pets"]["get"]["parameters"]
+        }
+
+        if spec.openapi_version.major < 3:
+            assert "collectionFormat" not in parameters["name"]
+            assert "multi" == parameters["tags"]["collectionFormat"]
+            assert "multi" == parameters["ids"]["collectionFormat"]
+        else:
+            assert "explode" not in parameters["name"]
+            assert parameters["tags"]["explode"]
+            assert parameters["ids"]["explode"]
+
     @pytest.mark.parametrize("spec_fixture", ("2.0",), indirect=True)
     def test_schema_uses_ref_if_available_v2(self, spec_fixture):
         spec_fixture.spec.components.schema("Pet", schema=PetSchema)
@@ -579,6 +627,14 @@ class TestSelfReference:
             "items": {"$ref": ref_path(spec) + "SelfReference"},
         }
 
+    def test_self_referencing_field_union(self, spec):
+        spec.components.schema("SelfReference", schema=UnionSelfReferencingSchema)
+        definitions = get_definitions(spec)
+        result = definitions["SelfReference"]["properties"]["link"]
+        assert result == {
+            "anyOf": [{"$ref": ref_path(spec) + "SelfReference"}, {"type": "string"}]
+        }
+
 
 class TestSchemaWithDefaultValues:
     def test_schema_with_default_values(self, spec):
@@ -626,3 +682,193 @@ class TestSchemaWithOptional:
         assert ["id"] == definition["required"]
         assert {"id": {"type": "integer"}, "name": {"type": "string"}} == props
 
+
+class TestPluginSharedBySpecs:
+    def test_one_plugin_for_several_specs(self):
+        plugin = SerpycoPlugin(builder_registry=SchemaBuilderRegistry())
+        spec_v2, spec_v3 = [
+            APISpec(
+                title="Shared",
+                version="0.1",
+                openapi_version=openapi_version,
+                plugins=(plugin,),
+            )
+            for openapi_version in ("2.0", "3.0.0")
+        ]
+
+        assert plugin.for_spec(spec_v2) is plugin
+        plugin_v3 = plugin.for_spec(spec_v3)
+        assert plugin_v3 is not plugin
+        assert plugin_v3.spec is spec_v3
+        assert (plugin_v3,) == spec_v3.plugins
+
+        spec_v2.components.schema("Analysis", schema=AnalysisSchema)
+        spec_v3.components.schema("Analysis", schema=AnalysisSchema)
+        spec_v3.components.schema("Pet", schema=PetSchema)
+        assert 2 == len(plugin.builder_registry._json_schemas)
+
+        for spec in (spec_v2, spec_v3):
+            sample_name = "tests.test_ext_serpyco.SampleSchema"
+            assert {"$ref": ref_path(spec) + sample_name} == get_definitions(spec)[
+                "Analysis"
+            ]["properties"]["sample"]
+
+        # Refs are kept per spec
+        spec_v2.path(
+            path="/pet",
+            operations={
+                "get": {"responses": {"200": {"schema": PetSchema, "description": ""}}}
+            },
+        )
+        spec_v3.path(
+            path="/pet",
+            operations={
+                "get": {
+                    "responses": {
+                        "200": {
+                            "content": {"application/json": {"schema": PetSchema}},
+                            "description": "",
+                        }
+                    }
+                }
+            },
+        )
+        response_v2 = get_paths(spec_v2)["/pet"]["get"]["responses"]["200"]
+        assert "$ref" not in response_v2["schema"]
+        response_v3 = get_paths(spec_v3)["/pet"]["get"]["responses"]["200"]
+        assert {"$ref": ref_path(spec_v3) + "Pet"} == response_v3["content"][
+            "application/json"
+        ]["schema"]
+        assert "Pet" not in plugin.conversion_times
+        assert "Pet" in plugin_v3.conversion_times
+
+
+class TestComponentIndex:
+    @staticmethod
+    def _make_children():
+        @dataclasses.dataclass
+        class Child(object):
+            id: int
+
+        first_child = Child
+
+        @dataclasses.dataclass
+        class Child(object):
+            name: str
+
+        return first_child, Child
+
+    def test_same_nested_definition_registered_once(self, spec):
+        spec.components.schema("Analysis", schema=AnalysisSchema)
+        spec.components.schema("Sample", schema=SampleSchema)
+        spec.components.schema("Other", {"type": "object"})
+
+        plugin = spec.plugins[0]
+        assert {
+            "Analysis",
+            "Sample",
+            "Other",
+            "tests.test_ext_serpyco.SampleSchema",
+            "tests.test_ext_serpyco.RunSchema_exclude_sample",
+        } == set(plugin._component_hashes)
+
+    def test_conflicting_nested_definitions(self):
+        first_child, second_child = self._make_children()
+
+        @dataclasses.dataclass
+        class FirstParent(object):
+            child: first_child
+
+        @dataclasses.dataclass
+        class SecondParent(object):
+            child: second_child
+
+        spec = APISpec(
+            title="Conflict",
+            version="0.1",
+            openapi_version="3.0.0",
+            plugins=(
+                SerpycoPlugin(schema_name_resolver=lambda type_, *args: type_.__name__),
+            ),
+        )
+        spec.components.schema("FirstParent", schema=FirstParent)
+        with pytest.raises(DuplicateComponentNameError):
+            spec.components.schema("SecondParent", schema=SecondParent)
+
+    def test_parallel_registration(self, spec):
+        schemas = [AnalysisSchema, AnalysisWithListSchema, SampleSchema, RunSchema]
+        threads = [
+            threading.Thread(
+                target=spec.components.schema,
+                args=(schema.__name__,),
+                kwargs={"schema": schema},
+            )
+            for schema in schemas
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        definitions = get_definitions(spec)
+        assert {schema.__name__ for schema in schemas} <= set(definitions)
+        assert "tests.test_ext_serpyco.SampleSchema" in definitions
+
+
+class TestRegisterPaths:
+    @staticmethod
+    def _get_paths(openapi_version):
+        if openapi_version.major < 3:
+            response = {"schema": PetSchema, "description": "Pet"}
+        else:
+            response = {
+                "content": {"application/json": {"schema": PetSchema}},
+                "description": "Pet",
+            }
+        paths = []
+        for index in range(3):
+            operations = {
+                "get": {
+                    "parameters": [{"in": "query", "schema": SampleSchema}],
+                    "responses": {"200": copy.deepcopy(response)},
+                }
+            }
+            paths.append(("/pets/{}".format(index), operations))
+        return paths
+
+    def test_register_paths(self, spec_fixture, monkeypatch):
+        registry = spec_fixture.serpyco_plugin.builder_registry
+        calls = []
+        json_schema = registry.json_schema
+        monkeypatch.setattr(
+            registry,
+            "json_schema",
+            lambda *args, **kwargs: calls.append(args) or json_schema(*args, **kwargs),
+        )
+        other_spec = APISpec(
+            title="Other",
+            version="0.1",
+            openapi_version=spec_fixture.spec.openapi_version.vstring,
+            plugins=(SerpycoPlugin(builder_registry=registry),),
+        )
+        for path, operations in self._get_paths(other_spec.openapi_version):
+            other_spec.path(path=path, operations=operations)
+        assert 3 == len(calls)
+
+        calls.clear()
+        spec_fixture.serpyco_plugin.register_paths(
+            self._get_paths(spec_fixture.spec.openapi_version)
+        )
+        assert 1 == len(calls)
+        assert get_paths(other_spec) == get_paths(spec_fixture.spec)
+        assert spec_fixture.openapi._batch_cache is None
+
+    def test_register_paths_with_kwargs(self, spec):
+        plugin = spec.plugins[0]
+        plugin.register_paths(
+            [
+                {"path": "/pets", "operations": {"get": {"responses": {}}}},
+                {"path": "/samples", "operations": {"get": {"responses": {}}}},
+            ]
+        )
+        assert {"/pets", "/samples"} == set(get_paths(spec))
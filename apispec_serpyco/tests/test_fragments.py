@@ -0,0 +1,94 @@
+# coding: utf-8
+from apispec_serpyco.fragments import prune_components
+from apispec_serpyco.fragments import spec_fragment
+from tests.test_ext_serpyco import AnalysisSchema
+from tests.test_ext_serpyco import PetSchema
+from tests.utils import get_definitions
+from tests.utils import ref_path
+
+
+def _register_paths(spec):
+    spec.components.schema("Pet", schema=PetSchema)
+    spec.components.schema("Analysis", schema=AnalysisSchema)
+    if spec.openapi_version.major < 3:
+        pet_response = {"schema": PetSchema}
+        analysis_response = {"schema": AnalysisSchema}
+    else:
+        pet_response = {"content": {"application/json": {"schema": PetSchema}}}
+        analysis_response = {
+            "content": {"application/json": {"schema": AnalysisSchema}}
+        }
+    spec.tag({"name": "pets"})
+    spec.tag({"name": "analysis"})
+    spec.path(
+        "/pets",
+        operations={"get": {"tags": ["pets"], "responses": {"200": pet_response}}},
+    )
+    spec.path(
+        "/analysis",
+        operations={
+            "get": {"tags": ["analysis"], "responses": {"200": analysis_response}}
+        },
+    )
+
+
+def _schemas(spec, fragment):
+    if spec.openapi_version.major < 3:
+        return fragment["definitions"]
+    return fragment["components"]["schemas"]
+
+
+class TestSpecFragment:
+    def test_fragment_by_path(self, spec):
+        _register_paths(spec)
+        fragment = spec_fragment(spec, paths=["/pets"])
+
+        assert ["/pets"] == list(fragment["paths"])
+        assert ["Pet"] == list(_schemas(spec, fragment))
+        assert [{"name": "pets"}] == fragment["tags"]
+        # spec itself is untouched
+        assert 2 == len(spec.to_dict()["paths"])
+
+    def test_fragment_by_tag_includes_nested_components(self, spec):
+        _register_paths(spec)
+        fragment = spec_fragment(spec, tags=["analysis"])
+
+        assert ["/analysis"] == list(fragment["paths"])
+        schemas = _schemas(spec, fragment)
+        assert "Pet" not in schemas
+        assert "Analysis" in schemas
+        sample_ref = schemas["Analysis"]["properties"]["sample"]["$ref"]
+        assert sample_ref[len(ref_path(spec)) :] in schemas
+        assert 3 == len(schemas)
+
+
+class TestPruneComponents:
+    def test_prune_unreferenced_components(self, spec):
+        _register_paths(spec)
+        spec.components.schema("Unused", schema=PetSchema)
+        spec.components.schema("Pinned", schema=AnalysisSchema)
+
+        pruned = prune_components(spec)
+        schemas = _schemas(spec, pruned)
+        assert "Unused" not in schemas
+        assert "Pinned" not in schemas
+        assert {"Pet", "Analysis"} <= set(schemas)
+        assert 4 == len(schemas)
+        assert "Unused" in get_definitions(spec)
+
+    def test_prune_keeps_pinned_components(self, spec):
+        spec.components.schema("Unused", schema=PetSchema)
+        spec.components.schema("Pinned", schema=AnalysisSchema)
+
+        pruned = prune_components(spec, pinned=["Pinned"])
+        schemas = _schemas(spec, pruned)
+        assert "Unused" not in schemas
+        assert "Pinned" in schemas
+        # with SampleSchema and RunSchema_exclude_sample
+        assert 3 == len(schemas)
+
+    def test_prune_removes_empty_sections(self, spec):
+        spec.components.schema("Unused", schema=PetSchema)
+        pruned = prune_components(spec)
+        assert "definitions" not in pruned
+        assert "components" not in pruned
@@ -0,0 +1,66 @@
+# coding: utf-8
+import hashlib
+import threading
+import types
+
+import pytest
+
+from apispec_serpyco.frozen import FrozenSpec
+from apispec_serpyco.frozen import freeze
+from apispec_serpyco.shared import dump_spec
+from tests.test_ext_serpyco import PetSchema
+from tests.test_ext_serpyco import SampleSchema
+
+
+class TestFreeze:
+    def test_freeze_snapshot(self, spec):
+        spec.components.schema("Pet", schema=PetSchema)
+        frozen = freeze(spec)
+
+        assert frozen.to_dict() == spec.to_dict()
+        assert frozen.to_bytes() == dump_spec(spec)
+        assert frozen.digest == hashlib.sha256(dump_spec(spec)).hexdigest()
+
+        # Later spec changes are not reflected
+        spec.components.schema("Sample", schema=SampleSchema)
+        assert frozen.to_dict() != spec.to_dict()
+
+    def test_frozen_spec_is_read_only(self, spec):
+        spec.components.schema("Pet", schema=PetSchema)
+        frozen = freeze(spec)
+
+        assert isinstance(frozen["info"], types.MappingProxyType)
+        with pytest.raises(TypeError):
+            frozen.data["info"] = {}
+        with pytest.raises(TypeError):
+            frozen["info"]["title"] = "Other"
+        with pytest.raises(AttributeError):
+            frozen._bytes = b"{}"
+
+        copy = frozen.to_dict()
+        copy["info"]["title"] = "Other"
+        assert frozen["info"]["title"] != "Other"
+
+    def test_frozen_spec_is_hashable(self, spec):
+        spec.components.schema("Pet", schema=PetSchema)
+        first = freeze(spec)
+        second = freeze(spec.to_dict())
+
+        assert first == second
+        assert {first: "spec"}[second] == "spec"
+        assert first != FrozenSpec(b"{}")
+
+    def test_share_between_threads(self, spec):
+        spec.components.schema("Pet", schema=PetSchema)
+        frozen = freeze(spec)
+        results = []
+
+        def read():
+            results.append(frozen.to_bytes() is frozen.to_bytes())
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert [True] * 4 == results
@@ -0,0 +1,107 @@
+# coding: utf-8
+import json
+import typing
+
+import pytest
+import serpyco
+
+from apispec_serpyco.registry import SchemaBuilderRegistry
+from apispec_serpyco.utils import schema_name_resolver
+import dataclasses
+from tests.test_ext_serpyco import AnalysisSchema
+from tests.test_ext_serpyco import PetSchema
+from tests.test_ext_serpyco import SelfReferencingSchema
+from tests.utils import get_definitions
+
+T = typing.TypeVar("T")
+U = typing.TypeVar("U")
+
+
+@dataclasses.dataclass
+class Page(typing.Generic[T]):
+    """Page of items"""
+
+    items: typing.List[T]
+    first: typing.Optional[T] = serpyco.field(default=None, description="First")
+    total: int = 0
+
+
+@dataclasses.dataclass
+class Pair(typing.Generic[T, U]):
+    left: T
+    right: typing.Dict[str, U]
+
+
+@dataclasses.dataclass
+class Constrained(typing.Generic[T]):
+    value: T = serpyco.field(max_length=12)
+
+
+@dataclasses.dataclass
+class Box(typing.Generic[T]):
+    value: T
+
+
+@dataclasses.dataclass
+class Outer(typing.Generic[T]):
+    inner: Box[T]
+
+
+def _dumps(json_schema):
+    return json.dumps(json_schema, sort_keys=True)
+
+
+class TestGenericTemplates:
+    @pytest.mark.parametrize(
+        "alias",
+        [
+            Page[PetSchema],
+            Page[int],
+            Page[AnalysisSchema],
+            Page[SelfReferencingSchema],
+            Pair[PetSchema, str],
+            Pair[SelfReferencingSchema, AnalysisSchema],
+            Outer[str],
+            Outer[PetSchema],
+        ],
+    )
+    @pytest.mark.parametrize(
+        "get_definition_name",
+        [serpyco.schema.default_get_definition_name, schema_name_resolver],
+    )
+    def test_specialization_equals_full_conversion(self, alias, get_definition_name):
+        registry = SchemaBuilderRegistry()
+        expected = serpyco.SchemaBuilder(
+            alias, get_definition_name=get_definition_name
+        ).json_schema()
+
+        json_schema = registry.json_schema(
+            alias, get_definition_name=get_definition_name
+        )
+
+        assert _dumps(expected) == _dumps(json_schema)
+
+    def test_template_is_built_once(self, converted):
+        registry = SchemaBuilderRegistry()
+        registry.json_schema(Page[PetSchema])
+        registry.json_schema(Page[AnalysisSchema])
+        registry.json_schema(Page[int])
+
+        assert 1 == len(registry._generic_templates)
+        assert Page[PetSchema] not in converted
+
+    def test_type_dependent_hints_fall_back_to_full_conversion(self):
+        registry = SchemaBuilderRegistry()
+        json_schema = registry.json_schema(Constrained[str])
+
+        assert not registry._generic_templates
+        assert 12 == json_schema["properties"]["value"]["maxLength"]
+
+    def test_nested_generic_falls_back_to_full_conversion(self, spec):
+        spec.components.schema("OuterStr", schema=Outer[str])
+        spec.components.schema("OuterInt", schema=Outer[int])
+
+        definitions = get_definitions(spec)
+        assert "tests.test_generics.Box[str]" in definitions
+        assert "tests.test_generics.Box[int]" in definitions
+        assert not [name for name in definitions if "Placeholder" in name]
@@ -0,0 +1,58 @@
+# coding: utf-8
+import sys
+import types
+import typing
+
+from apispec_serpyco import hints
+from apispec_serpyco.hints import get_type_hints
+from apispec_serpyco.hints import is_current_class
+from dataclasses import dataclass
+from tests.test_ext_serpyco import RunSchema
+from tests.test_ext_serpyco import SampleSchema
+
+_MODULE_SOURCE = """
+import typing
+from dataclasses import dataclass
+
+
+@dataclass
+class Owner:
+    name: str
+
+
+@dataclass
+class Pet:
+    owners: typing.List["Owner"]
+"""
+
+_OWNER_SOURCE = """
+@dataclass
+class Owner:
+    name: str
+    email: str
+"""
+
+
+class TestTypeHints:
+    def test_forward_references_resolved_once(self):
+        hints.clear()
+        type_hints = get_type_hints(SampleSchema)
+
+        assert typing.List[RunSchema] == type_hints["runs"]
+        assert type_hints is get_type_hints(SampleSchema)
+
+    def test_redefined_class(self, monkeypatch):
+        module = types.ModuleType("hints_models")
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+        exec(_MODULE_SOURCE, module.__dict__)
+        owner, pet = module.Owner, module.Pet
+
+        type_hints = get_type_hints(pet)
+        assert typing.List[owner] == type_hints["owners"]
+        assert type_hints is get_type_hints(pet)
+
+        # Redefine referenced class, like a module reload would do
+        exec(_OWNER_SOURCE, module.__dict__)
+        assert not is_current_class(owner)
+        assert is_current_class(module.Owner)
+        assert typing.List[module.Owner] == get_type_hints(pet)["owners"]
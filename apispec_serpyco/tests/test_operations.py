@@ -0,0 +1,119 @@
+# coding: utf-8
+from apispec.exceptions import APISpecError
+import pytest
+
+from apispec_serpyco.operations import OperationIndex
+import dataclasses
+from tests.test_ext_serpyco import PetSchema
+
+
+@dataclasses.dataclass
+class BrokenSchema(object):
+    owner: "UnknownSchema"  # noqa: F821
+
+
+class TestPluginOperations:
+    def test_operations_indexed_on_registration(self, spec):
+        spec.path(
+            path="/pets",
+            operations={
+                "get": {"operationId": "listPets", "tags": ["pets"]},
+                "post": {"operationId": "createPet", "tags": ["pets", "admin"]},
+            },
+        )
+        spec.path(
+            path="/pets/{pet_id}",
+            operations={
+                "get": {
+                    "operationId": "getPet",
+                    "tags": ["pets"],
+                    "responses": {"200": {"schema": PetSchema}},
+                }
+            },
+        )
+        operations = spec.plugins[0].operations
+        paths = spec.to_dict()["paths"]
+
+        assert 3 == len(operations)
+        assert paths["/pets"]["post"] is operations.get("POST", "/pets")
+        assert operations.get("delete", "/pets") is None
+        assert ("get", "/pets/{pet_id}") == operations.get_by_id("getPet")[:2]
+        # Indexed operations are the spec ones, once resolved
+        assert paths["/pets/{pet_id}"]["get"] is operations.get_by_id("getPet")[2]
+        assert operations.get_by_id("unknown") is None
+        assert [("get", "/pets"), ("post", "/pets"), ("get", "/pets/{pet_id}")] == [
+            operation[:2] for operation in operations.get_by_tag("pets")
+        ]
+        assert ["createPet"] == [
+            operation.operation["operationId"]
+            for operation in operations.get_by_tag("admin")
+        ]
+
+    def test_failing_path_not_indexed(self, spec):
+        with pytest.raises(NameError):
+            spec.path(
+                path="/pets",
+                operations={
+                    "get": {
+                        "operationId": "listPets",
+                        "parameters": [{"in": "query", "schema": BrokenSchema}],
+                    }
+                },
+            )
+
+        operations = spec.plugins[0].operations
+        assert 0 == len(operations)
+        assert operations.get_by_id("listPets") is None
+
+
+class TestOperationIndex:
+    def test_match(self):
+        index = OperationIndex()
+        index.add("/pets", {"get": {}})
+        index.add("/pets/{pet_id}", {"get": {}, "delete": {}})
+        index.add("/pets/mine", {"get": {"operationId": "mine"}})
+        index.add("/pets/{pet_id}/toys/{toy_id}", {"get": {}})
+        index.add("/{kind}/mine", {"get": {}})
+
+        match = index.match("GET", "/pets/12")
+        assert ("get", "/pets/{pet_id}", {"pet_id": "12"}) == (
+            match.method,
+            match.path,
+            match.path_params,
+        )
+        assert {"pet_id": "12", "toy_id": "ball"} == index.match(
+            "get", "/pets/12/toys/ball"
+        ).path_params
+        assert "/pets" == index.match("get", "/pets").path
+        # Concrete paths first
+        assert "mine" == index.match("get", "/pets/mine").operation["operationId"]
+        assert "/pets/{pet_id}" == index.match("delete", "/pets/mine").path
+        assert "/{kind}/mine" == index.match("get", "/toys/mine").path
+        assert index.match("post", "/pets/12") is None
+        # Less concrete paths having an operation for the method
+        index.add("/{kind}/{id}", {"post": {"operationId": "create"}})
+        match = index.match("post", "/pets/12")
+        assert ("/{kind}/{id}", {"kind": "pets", "id": "12"}) == (
+            match.path,
+            match.path_params,
+        )
+        assert "create" == index.match("post", "/pets/mine").operation["operationId"]
+        assert index.match("get", "/pets/12/toys") is None
+        assert index.match("get", "/pets/") is None
+
+        # Matcher is updated with new paths
+        index.add("/toys/{toy_id}", {"get": {}})
+        assert {"toy_id": "ball"} == index.match("get", "/toys/ball").path_params
+
+    def test_operation_id_unique(self):
+        index = OperationIndex()
+        index.add("/pets", {"get": {"operationId": "listPets", "tags": ["pets"]}})
+
+        with pytest.raises(APISpecError):
+            index.add("/animals", {"get": {"operationId": "listPets"}})
+
+        # Registering the same operation again replaces it
+        index.add("/pets", {"get": {"operationId": "listPets", "tags": ["animals"]}})
+        assert 1 == len(index)
+        assert [] == index.get_by_tag("pets")
+        assert "/pets" == index.get_by_id("listPets").path
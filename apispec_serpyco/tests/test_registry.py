@@ -0,0 +1,308 @@
+# coding: utf-8
+import importlib
+import json
+import os
+import sys
+import typing
+
+from apispec import APISpec
+import pytest
+import serpyco
+
+from apispec_serpyco import SerpycoPlugin
+from apispec_serpyco.registry import SchemaBuilderRegistry
+from apispec_serpyco.registry import default_registry
+import dataclasses
+from tests.test_ext_serpyco import AnalysisSchema
+from tests.test_ext_serpyco import PetSchema
+from tests.test_ext_serpyco import RunSchema
+from tests.test_ext_serpyco import SampleSchema
+from tests.test_ext_serpyco import SelfReferencingSchema
+from tests.utils import get_definitions
+
+
+class TestSchemaBuilderRegistry:
+    def test_builders_and_serializers_are_cached(self):
+        registry = SchemaBuilderRegistry()
+        builder = registry.get_builder(PetSchema)
+        assert builder is registry.get_builder(PetSchema)
+        assert builder is not registry.get_builder(PetSchema, only=["id"])
+
+        serializer = registry.get_serializer(PetSchema)
+        assert isinstance(serializer, serpyco.Serializer)
+        assert serializer is registry.get_serializer(PetSchema)
+
+    def test_json_schema_returns_copies(self):
+        registry = SchemaBuilderRegistry()
+        json_schema = registry.json_schema(PetSchema)
+        json_schema["properties"].clear()
+        assert "id" in registry.json_schema(PetSchema)["properties"]
+        assert {"type": "integer", "description": "Pet id"} == (
+            registry.field_json_schema(PetSchema, "id")
+        )
+
+    def test_nested_definitions_are_shared(self):
+        registry = SchemaBuilderRegistry()
+        pet_schema = registry.json_schema(PetSchema)
+        registry.json_schema(TreeSchema)
+        registry.json_schema(RenamedSchema)
+
+        pet_name = "tests.test_ext_serpyco.PetSchema"
+        tree_definitions = registry._get_json_schema(TreeSchema)["definitions"]
+        renamed_definitions = registry._get_json_schema(RenamedSchema)["definitions"]
+        assert pet_schema["properties"] == tree_definitions[pet_name]["properties"]
+        assert tree_definitions[pet_name] is renamed_definitions[pet_name]
+        assert tree_definitions[pet_name]["properties"] is (
+            registry._get_json_schema(PetSchema)["properties"]
+        )
+
+    def test_shared_definitions_registered_once(self, spec, monkeypatch):
+        registered = []
+        register_definition = SerpycoPlugin._register_definition
+
+        def _register_definition(plugin, name, definition):
+            registered.append(name)
+            register_definition(plugin, name, definition)
+
+        monkeypatch.setattr(SerpycoPlugin, "_register_definition", _register_definition)
+        spec.components.schema("Tree", schema=TreeSchema)
+        spec.components.schema("Renamed", schema=RenamedSchema)
+
+        pet_name = "tests.test_ext_serpyco.PetSchema"
+        assert 1 == registered.count(pet_name)
+        assert "id" in get_definitions(spec)[pet_name]["properties"]
+
+    def test_registry_shared_by_specs(self):
+        registry = SchemaBuilderRegistry()
+        specs = [
+            APISpec(
+                title="Registry",
+                version="0.1",
+                openapi_version=openapi_version,
+                plugins=(SerpycoPlugin(builder_registry=registry),),
+            )
+            for openapi_version in ("2.0", "3.0.0")
+        ]
+        for spec in specs:
+            spec.components.schema("Pet", schema=PetSchema)
+
+        assert 1 == len(registry._json_schemas)
+        for spec in specs:
+            assert "id" in get_definitions(spec)["Pet"]["properties"]
+
+    def test_default_registry_is_opt_in(self):
+        plugin = SerpycoPlugin()
+        specs = [
+            APISpec(
+                title="Registry",
+                version="0.1",
+                openapi_version=openapi_version,
+                plugins=(plugin,),
+            )
+            for openapi_version in ("2.0", "3.0.0")
+        ]
+        for spec in specs:
+            spec.components.schema("Pet", schema=PetSchema)
+
+        assert plugin.builder_registry is not default_registry
+        # Plugin copies share the plugin registry
+        assert plugin.builder_registry is plugin.for_spec(specs[1]).builder_registry
+        assert 1 == len(plugin.builder_registry._json_schemas)
+        assert PetSchema not in {key[0] for key in default_registry._json_schemas}
+
+
+@dataclasses.dataclass
+class RenamedSchema(object):
+    id: int
+    pet: PetSchema = serpyco.field(dict_key="animal")
+    analysis: typing.Optional[AnalysisSchema] = None
+
+
+@dataclasses.dataclass
+class TreeSchema(object):
+    name: str
+    pet: PetSchema
+    children: typing.List["TreeSchema"]
+
+
+class TestVariants:
+    @pytest.mark.parametrize(
+        "dataclass_,only,exclude",
+        [
+            (SampleSchema, None, ["runs"]),
+            (SampleSchema, ["runs"], None),
+            (RunSchema, None, ["sample"]),
+            (RenamedSchema, ["pet"], None),
+            (RenamedSchema, None, ["pet"]),
+            (RenamedSchema, ["id", "analysis"], ["analysis"]),
+            # Self references: serpyco adds a definition of the full schema
+            (TreeSchema, None, ["pet"]),
+            (TreeSchema, ["name", "pet"], None),
+            (SelfReferencingSchema, None, ["id"]),
+        ],
+    )
+    def test_variant_equals_full_conversion(self, dataclass_, only, exclude):
+        registry = SchemaBuilderRegistry()
+        expected = serpyco.SchemaBuilder(
+            dataclass_, only=only, exclude=exclude
+        ).json_schema()
+
+        json_schema = registry.json_schema(dataclass_, only=only, exclude=exclude)
+
+        assert json.dumps(expected, sort_keys=True) == json.dumps(
+            json_schema, sort_keys=True
+        )
+
+    def test_variants_are_cached_by_field_set(self, converted):
+        registry = SchemaBuilderRegistry()
+        registry.json_schema(RenamedSchema, only=["id"])
+        registry.json_schema(RenamedSchema, exclude=["pet", "analysis"])
+        registry.json_schema(RenamedSchema, only=["id", "pet", "analysis"])
+
+        # full schema and one variant, each built once
+        assert 2 == len(registry._json_schemas)
+        assert [RenamedSchema, RenamedSchema] == converted
+
+
+_MODELS_SOURCE = """
+import dataclasses
+import typing
+
+from {package}.other_models import Owner
+
+
+@dataclasses.dataclass
+class Cat(object):
+    name: str
+
+
+@dataclasses.dataclass
+class Home(object):
+    cats: typing.List[Cat]
+    owner: Owner
+"""
+
+_ITEMS_SOURCE = """
+import dataclasses
+
+from {package}.enums import Kind
+
+
+@dataclasses.dataclass
+class Item(object):
+    kind: Kind
+"""
+
+
+class TestSourceCache:
+    @pytest.fixture
+    def package(self, tmp_path, monkeypatch):
+        name = "source_cache_{}".format(tmp_path.name.replace("-", "_"))
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "__init__.py").write_text("")
+        (tmp_path / name / "models.py").write_text(_MODELS_SOURCE.format(package=name))
+        self._write_owner(tmp_path / name, "name: str")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        yield tmp_path / name
+        for module_name in list(sys.modules):
+            if module_name.startswith(name):
+                del sys.modules[module_name]
+
+    @staticmethod
+    def _write_owner(directory, fields):
+        path = directory / "other_models.py"
+        path.write_text(
+            "import dataclasses\n\n\n"
+            "@dataclasses.dataclass\nclass Owner(object):\n    {}\n".format(fields)
+        )
+        # Make sure a rewrite is seen even with a coarse mtime resolution
+        stat = os.stat(str(path))
+        os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    @staticmethod
+    def _import(package):
+        importlib.invalidate_caches()
+        other_models = importlib.import_module(package.name + ".other_models")
+        models = importlib.import_module(package.name + ".models")
+        return importlib.reload(other_models), importlib.reload(models)
+
+    def test_reload_reuses_unchanged_schemas(self, package, converted):
+        registry = SchemaBuilderRegistry(source_cache=True)
+        _, models = self._import(package)
+        home_schema = registry.json_schema(models.Home)
+        registry.json_schema(models.Cat)
+        assert 2 == len(converted)
+
+        # Reload without source change: schemas are reused
+        _, models = self._import(package)
+        assert home_schema == registry.json_schema(models.Home)
+        registry.json_schema(models.Cat)
+        assert 2 == len(converted)
+
+        # A referenced module changed: only dependent schemas are converted
+        self._write_owner(package, "age: int")
+        _, models = self._import(package)
+        registry.json_schema(models.Cat)
+        assert 2 == len(converted)
+        home_schema = registry.json_schema(models.Home)
+        assert 3 == len(converted)
+        owner_name = "{}.other_models.Owner".format(package.name)
+        assert "age" in home_schema["definitions"][owner_name]["properties"]
+
+    def test_save_and_load(self, package, tmp_path, converted):
+        registry = SchemaBuilderRegistry(source_cache=True)
+        _, models = self._import(package)
+        home_schema = registry.json_schema(models.Home)
+        registry.json_schema(models.Cat)
+        cache_path = str(tmp_path / "cache.json")
+
+        # Entries with changed sources are not saved
+        self._write_owner(package, "age: int")
+        registry.save_source_cache(cache_path)
+        registry = SchemaBuilderRegistry(source_cache=True)
+        registry.load_source_cache(cache_path)
+        assert 1 == len(registry._source_cache)
+        del converted[:]
+
+        _, models = self._import(package)
+        registry.json_schema(models.Cat)
+        assert 0 == len(converted)
+        assert home_schema != registry.json_schema(models.Home)
+
+    @staticmethod
+    def _write_enum(directory, members):
+        path = directory / "enums.py"
+        path.write_text(
+            "import enum\n\n\nclass Kind(enum.Enum):\n{}".format(
+                "".join('    {0} = "{0}"\n'.format(member) for member in members)
+            )
+        )
+        stat = os.stat(str(path))
+        os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def test_referenced_type_changed(self, package):
+        (package / "items.py").write_text(_ITEMS_SOURCE.format(package=package.name))
+        self._write_enum(package, ("a", "b"))
+        registry = SchemaBuilderRegistry(source_cache=True)
+        enums = importlib.import_module(package.name + ".enums")
+        items = importlib.import_module(package.name + ".items")
+        assert ["a", "b"] == registry.json_schema(items.Item)["properties"]["kind"][
+            "enum"
+        ]
+
+        # Module of the enum changed, not the one of the dataclass
+        self._write_enum(package, ("a", "b", "c"))
+        importlib.reload(enums)
+        items = importlib.reload(items)
+        assert ["a", "b", "c"] == registry.json_schema(items.Item)["properties"][
+            "kind"
+        ]["enum"]
+
+    def test_not_cached_by_source(self):
+        registry = SchemaBuilderRegistry(source_cache=True)
+        registry.json_schema(PetSchema, get_definition_name=lambda *args: "Pet")
+        registry.json_schema(PetSchema, type_encoders={})
+        assert not registry._source_cache
+
+        with pytest.raises(ValueError):
+            SchemaBuilderRegistry().save_source_cache("cache.json")
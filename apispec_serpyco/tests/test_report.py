@@ -0,0 +1,62 @@
+# coding: utf-8
+import json
+
+from apispec_serpyco.report import build_report
+from apispec_serpyco.report import main
+from apispec_serpyco.report import report_to_table
+from apispec_serpyco.report import sort_report
+from tests.conftest import make_spec
+from tests.test_ext_serpyco import AnalysisSchema
+from tests.test_ext_serpyco import PetSchema
+
+
+def make_report_spec():
+    spec = make_spec("3.0.0").spec
+    spec.components.schema("Pet", schema=PetSchema)
+    spec.components.schema("Analysis", schema=AnalysisSchema)
+    return spec
+
+
+class TestReport:
+    def test_build_report(self, spec):
+        spec.components.schema("Pet", schema=PetSchema)
+        spec.components.schema("Analysis", schema=AnalysisSchema)
+        reports = {report.name: report for report in build_report(spec)}
+
+        assert {
+            "Pet",
+            "Analysis",
+            "tests.test_ext_serpyco.SampleSchema",
+            "tests.test_ext_serpyco.RunSchema_exclude_sample",
+        } == set(reports)
+        assert reports["Pet"].size > 0
+        assert reports["Pet"].conversion_time > 0
+        assert reports["Pet"].inbound_refs == 0
+        assert reports["Pet"].depth == 0
+        assert reports["tests.test_ext_serpyco.SampleSchema"].inbound_refs == 1
+        assert reports["tests.test_ext_serpyco.SampleSchema"].conversion_time is None
+        assert reports["Analysis"].depth == 2
+
+    def test_sort_and_format_report(self, spec):
+        spec.components.schema("Pet", schema=PetSchema)
+        spec.components.schema("Analysis", schema=AnalysisSchema)
+        reports = sort_report(build_report(spec), key="conversion_time")
+
+        assert reports[-1].conversion_time is None
+        table = report_to_table(reports).splitlines()
+        assert table[0].startswith("name")
+        assert 5 == len(table)
+
+    def test_cli_json_output(self, tmp_path):
+        output = tmp_path / "report.json"
+        main(
+            [
+                "tests.test_report:make_report_spec",
+                "--format",
+                "json",
+                "--output",
+                str(output),
+            ]
+        )
+        reports = json.loads(output.read_text())
+        assert "Pet" in [report["name"] for report in reports]
@@ -0,0 +1,103 @@
+# coding: utf-8
+import json
+import os
+import posixpath
+
+from apispec_serpyco.refs import get_ref_target
+from apispec_serpyco.refs import iter_refs
+from apispec_serpyco.refs import path_to_ref
+from apispec_serpyco.refs import ref_to_path
+from apispec_serpyco.sharding import shard_spec
+from apispec_serpyco.sharding import write_shards
+from tests.test_ext_serpyco import AnalysisSchema
+from tests.test_ext_serpyco import PetSchema
+
+SAMPLE_NAME = "tests.test_ext_serpyco.SampleSchema"
+RUN_NAME = "tests.test_ext_serpyco.RunSchema_exclude_sample"
+
+
+def _register(spec):
+    spec.components.schema("Pet", schema=PetSchema)
+    spec.components.schema("Analysis", schema=AnalysisSchema)
+    if spec.openapi_version.major < 3:
+        response = {"schema": PetSchema, "description": ""}
+    else:
+        response = {
+            "content": {"application/json": {"schema": PetSchema}},
+            "description": "",
+        }
+    spec.path(path="/pets", operations={"get": {"responses": {"200": response}}})
+
+
+def _assert_refs_resolve(documents):
+    for file_path, document in documents.items():
+        for ref in iter_refs(document):
+            target_file, _, pointer = ref.partition("#")
+            if target_file:
+                target_file = posixpath.normpath(
+                    posixpath.join(posixpath.dirname(file_path), target_file)
+                )
+            else:
+                target_file = file_path
+            path = ref_to_path("#" + pointer)
+            assert get_ref_target(documents[target_file], path) is not None, ref
+
+
+class TestShardSpec:
+    def test_shard_by_module(self, spec):
+        _register(spec)
+        documents = shard_spec(spec)
+
+        shard = "components/tests.test_ext_serpyco.json"
+        assert {"", shard} == set(documents)
+        assert {"Pet", "Analysis", SAMPLE_NAME, RUN_NAME} == set(documents[shard])
+        assert "definitions" not in documents[""]
+        assert "schemas" not in documents[""].get("components", {})
+        assert {"$ref": "#/" + SAMPLE_NAME} == documents[shard]["Analysis"][
+            "properties"
+        ]["sample"]
+        _assert_refs_resolve(documents)
+
+    def test_refs_between_shards(self, spec):
+        _register(spec)
+        documents = shard_spec(
+            spec, shard_by=lambda name: "pets" if name == "Pet" else "analysis"
+        )
+
+        assert {
+            "",
+            "components/pets.json",
+            "components/analysis.json",
+        } == set(documents)
+        response = documents[""]["paths"]["/pets"]["get"]["responses"]["200"]
+        if spec.openapi_version.major > 2:
+            response = response["content"]["application/json"]
+        assert {"$ref": "components/pets.json#/Pet"} == response["schema"]
+        _assert_refs_resolve(documents)
+
+    def test_shard_by_prefix(self, spec):
+        _register(spec)
+        documents = shard_spec(spec.to_dict(), shard_by="prefix")
+        assert {"", "components/default.json", "components/tests.test.json"} == set(
+            documents
+        )
+        _assert_refs_resolve(documents)
+
+    def test_write_shards(self, spec, tmp_path):
+        _register(spec)
+        main_path = str(tmp_path / "openapi.json")
+        written = write_shards(spec, main_path)
+
+        assert main_path in written
+        shard_path = str(tmp_path / "components" / "tests.test_ext_serpyco.json")
+        assert shard_path in written
+        with open(shard_path) as file_:
+            assert {"Pet", "Analysis", SAMPLE_NAME, RUN_NAME} == set(json.load(file_))
+        assert 2 == len(os.listdir(str(tmp_path)))
+
+
+def test_path_to_ref():
+    ref = path_to_ref(("definitions", "a~b/c"))
+    assert "#/definitions/a~0b~1c" == ref
+    assert ("definitions", "a~b/c") == ref_to_path(ref)
+    assert "file.json#/Pet" == path_to_ref(("Pet",), "file.json")
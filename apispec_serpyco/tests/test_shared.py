@@ -0,0 +1,47 @@
+# coding: utf-8
+import multiprocessing
+
+import pytest
+
+from apispec_serpyco.shared import SharedSpec
+from apispec_serpyco.shared import dump_spec
+from apispec_serpyco.shared import shared_memory
+from tests.test_ext_serpyco import PetSchema
+
+
+def _attach_and_read(name, queue):
+    with SharedSpec.attach_shared_memory(name) as shared_spec:
+        queue.put(shared_spec.to_dict())
+
+
+class TestSharedSpec:
+    def test_publish_and_attach_file(self, spec, tmp_path):
+        spec.components.schema("Pet", schema=PetSchema)
+        path = str(tmp_path / "spec.json")
+
+        with SharedSpec.publish_file(spec, path) as published:
+            assert published.buffer.readonly
+            assert published.to_bytes() == dump_spec(spec)
+
+        with SharedSpec.attach_file(path) as attached:
+            assert attached.to_dict() == spec.to_dict()
+            assert attached.to_dict() is attached.to_dict()
+
+    @pytest.mark.skipif(shared_memory is None, reason="requires python >= 3.8")
+    def test_publish_and_attach_shared_memory(self, spec):
+        spec.components.schema("Pet", schema=PetSchema)
+        published = SharedSpec.publish_shared_memory(spec)
+        try:
+            assert published.buffer.readonly
+            context = multiprocessing.get_context("spawn")
+            queue = context.Queue()
+            process = context.Process(
+                target=_attach_and_read, args=(published.name, queue)
+            )
+            process.start()
+            attached_dict = queue.get(timeout=30)
+            process.join(timeout=30)
+            assert 0 == process.exitcode
+            assert attached_dict == published.to_dict()
+        finally:
+            published.unlink()
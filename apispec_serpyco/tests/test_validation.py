@@ -0,0 +1,151 @@
+# coding: utf-8
+import typing
+
+import pytest
+from serpyco import number_field
+from serpyco import string_field
+
+from apispec_serpyco.validation import ValidationError
+from apispec_serpyco.validation import ValidatorCompiler
+from dataclasses import dataclass
+from dataclasses import field
+from tests.test_ext_serpyco import SampleSchema
+from tests.test_ext_serpyco import SelfReferencingSchema
+
+
+@dataclass
+class ItemSchema(object):
+    name: str = string_field(min_length=1, max_length=8, pattern="^[a-z]+$")
+    quantity: int = number_field(minimum=1, maximum=10)
+    price: typing.Optional[float] = None
+    tags: typing.List[str] = field(default_factory=list)
+    position: typing.Tuple[int, int] = (0, 0)
+    metadata: typing.Dict[str, int] = field(default_factory=dict)
+
+
+def assert_invalid(validator, data, path):
+    with pytest.raises(ValidationError) as exc_info:
+        validator(data)
+    assert path == exc_info.value.path
+
+
+class TestPluginValidator:
+    def test_validate_component(self, spec):
+        spec.components.schema("Item", schema=ItemSchema)
+        validate = spec.plugins[0].get_validator("Item")
+
+        validate({"name": "apple", "quantity": 3})
+        validate(
+            {
+                "name": "apple",
+                "quantity": 3,
+                "price": 1,
+                "tags": ["fruit"],
+                "position": [1, 2],
+                "metadata": {"weight": 200},
+                "other": None,
+            }
+        )
+        assert_invalid(validate, [], ())
+        assert_invalid(validate, {"name": "apple"}, ())
+        assert_invalid(validate, {"name": "", "quantity": 3}, ("name",))
+        assert_invalid(validate, {"name": "Apple", "quantity": 3}, ("name",))
+        assert_invalid(validate, {"name": "apple", "quantity": 11}, ("quantity",))
+        assert_invalid(validate, {"name": "apple", "quantity": True}, ("quantity",))
+        assert_invalid(validate, {"name": "apple", "quantity": "3"}, ("quantity",))
+        # Optional properties are collapsed: not required, but not nullable
+        assert_invalid(
+            validate, {"name": "apple", "quantity": 3, "price": None}, ("price",)
+        )
+        assert_invalid(
+            validate, {"name": "apple", "quantity": 3, "tags": ["a", 1]}, ("tags", 1)
+        )
+        assert_invalid(
+            validate,
+            {"name": "apple", "quantity": 3, "position": [1, "2"]},
+            ("position", 1),
+        )
+        assert_invalid(
+            validate,
+            {"name": "apple", "quantity": 3, "metadata": {"weight": "heavy"}},
+            ("metadata", "weight"),
+        )
+
+    def test_validator_is_cached(self, spec):
+        spec.components.schema("Item", schema=ItemSchema)
+        plugin = spec.plugins[0]
+
+        assert plugin.get_validator("Item") is plugin.get_validator("Item")
+        with pytest.raises(KeyError):
+            plugin.get_validator("Unknown")
+
+    def test_validate_references(self, spec):
+        spec.components.schema("Sample", schema=SampleSchema)
+        spec.components.schema("SelfReferencing", schema=SelfReferencingSchema)
+        plugin = spec.plugins[0]
+
+        validate = plugin.get_validator("Sample")
+        validate({"count": 1, "runs": [{}]})
+        assert_invalid(validate, {"count": 1, "runs": [{}, 1]}, ("runs", 1))
+
+        validate = plugin.get_validator("SelfReferencing")
+        invalid = {"id": "2", "single": {}, "many": []}
+        assert_invalid(
+            validate, {"id": 1, "single": invalid, "many": []}, ("single", "id")
+        )
+        assert_invalid(
+            validate, {"id": 1, "many": [invalid], "single": {}}, ("many", 0, "id")
+        )
+        assert_invalid(validate, {"id": 1, "single": {}, "many": []}, ("single",))
+
+
+class TestValidatorCompiler:
+    def test_compile_keywords(self):
+        compiler = ValidatorCompiler({"components": {"schemas": {}}})
+
+        validate = compiler.compile(
+            {
+                "type": "object",
+                "additionalProperties": False,
+                "properties": {
+                    "kind": {"enum": ["a", "b"]},
+                    "value": {"type": "number", "nullable": True, "multipleOf": 0.5},
+                    "one": {"oneOf": [{"type": "integer"}, {"minimum": 2}]},
+                    "ids": {"type": "array", "uniqueItems": True},
+                },
+            }
+        )
+        validate({"kind": "a", "value": None, "one": 1, "ids": [1, True, "1"]})
+        validate({"value": 1.5, "one": 2.5})
+        assert_invalid(validate, {"extra": 1}, ())
+        assert_invalid(validate, {"kind": "c"}, ("kind",))
+        assert_invalid(validate, {"value": 1.2}, ("value",))
+        assert_invalid(validate, {"one": 3}, ("one",))
+        assert_invalid(validate, {"ids": [1, 1]}, ("ids",))
+
+    def test_numbers_equal_by_value(self):
+        compiler = ValidatorCompiler({})
+
+        validate = compiler.compile({"enum": [1.0, [2], {"a": 3.0}, False]})
+        validate(1)
+        validate([2.0])
+        validate({"a": 3})
+        validate(False)
+        assert_invalid(validate, True, ())
+        assert_invalid(validate, 0, ())
+        assert_invalid(validate, [True], ())
+
+        validate = compiler.compile({"uniqueItems": True})
+        validate([1, True, [1], [True], {"a": 0}, {"a": False}])
+        assert_invalid(validate, [1, 1.0], ())
+        assert_invalid(validate, [[1], [1.0]], ())
+        assert_invalid(validate, [{"a": 1}, {"a": 1.0}], ())
+
+    def test_error_message(self):
+        validate = ValidatorCompiler({}).compile(
+            {"items": {"properties": {"id": {"type": "integer"}}}}
+        )
+
+        with pytest.raises(ValidationError) as exc_info:
+            validate([{"id": 1}, {"id": "2"}])
+        assert "1/id: '2' is not of type 'integer'" == str(exc_info.value)